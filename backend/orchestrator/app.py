@@ -5,17 +5,25 @@ from pydantic import BaseModel
 from typing import Dict, List, Optional
 import asyncio
 import uuid
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
 import json
 import sys
 import os
+import time
 
 # Add the parent directory to the path to import shared modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from shared.a2a_client import A2AClient, traffic_monitor
 
-app = FastAPI(title="A2A Customer Service Orchestrator", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Release the A2A client's pooled connections on shutdown"""
+    yield
+    await a2a_client.aclose()
+
+app = FastAPI(title="A2A Customer Service Orchestrator", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +39,7 @@ class IncidentRequest(BaseModel):
     order: dict
     failure_details: dict
     deadline: Optional[str] = None
+    latency_critical: bool = False  # Hedge slow agent calls to a second replica
 
 class TaskResult(BaseModel):
     task_id: str
@@ -43,12 +52,32 @@ class TaskResult(BaseModel):
 active_incidents: Dict[str, dict] = {}
 
 # Initialize A2A client for orchestrator
-a2a_client = A2AClient("orchestrator-001", "http://localhost:8000")
+a2a_client = A2AClient(
+    "orchestrator-001",
+    "http://localhost:8000",
+    selection_policy=os.getenv("A2A_SELECTION_POLICY", "power_of_two")
+)
+
+def parse_deadline(deadline: Optional[str]) -> Optional[float]:
+    """Parse an ISO 8601 incident deadline into an epoch timestamp (naive times are UTC)"""
+    
+    if not deadline:
+        return None
+    
+    parsed = datetime.fromisoformat(deadline.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
 
 @app.post("/incidents")
 async def create_incident(incident: IncidentRequest, background_tasks: BackgroundTasks):
     """Create and orchestrate incident resolution using real A2A communication"""
     
+    try:
+        parse_deadline(incident.deadline)
+    except ValueError:
+        raise HTTPException(status_code=422, detail=f"Invalid deadline '{incident.deadline}', expected ISO 8601")
+    
     incident_id = f"incident-{datetime.utcnow().strftime('%Y%m%d')}-{str(uuid.uuid4())[:8]}"
     
     # Store incident details
@@ -61,6 +90,7 @@ async def create_incident(incident: IncidentRequest, background_tasks: Backgroun
         "order": incident.order,
         "failure_details": incident.failure_details,
         "deadline": incident.deadline,
+        "latency_critical": incident.latency_critical,
         "tasks": {},
         "resolution": None,
         "a2a_traffic": []
@@ -151,6 +181,12 @@ async def orchestrate_real_a2a_incident(incident_id: str, incident_data: dict):
     """Orchestrate incident resolution using real A2A agent communication"""
     
     try:
+        deadline = parse_deadline(incident_data["deadline"])
+        if deadline is not None and deadline <= time.time():
+            active_incidents[incident_id]["status"] = "failed"
+            active_incidents[incident_id]["error"] = "Incident deadline exceeded"
+            return
+        
         # Update incident status
         active_incidents[incident_id]["status"] = "discovering_agents"
         
@@ -168,7 +204,7 @@ async def orchestrate_real_a2a_incident(incident_id: str, incident_data: dict):
         
         # Create and execute tasks based on incident type
         if incident_data["incident_type"] == "payment_failure":
-            await execute_payment_failure_resolution(incident_id, incident_data, agents)
+            await execute_payment_failure_resolution(incident_id, incident_data, agents, deadline)
         else:
             await execute_generic_incident_resolution(incident_id, incident_data, agents)
         
@@ -176,6 +212,29 @@ async def orchestrate_real_a2a_incident(incident_id: str, incident_data: dict):
         active_incidents[incident_id]["status"] = "failed"
         active_incidents[incident_id]["error"] = str(e)
         print(f"Orchestration failed for {incident_id}: {e}")
+        cancel_outstanding_tasks(incident_id)
+
+def cancel_outstanding_tasks(incident_id: str):
+    """Cancel an incident's agent sub-tasks that did not complete, without waiting
+    
+    The agents being cancelled are often the hung ones, so the cancels run
+    in the background instead of delaying the incident's resolution.
+    """
+    
+    tasks = active_incidents[incident_id].get("tasks", {})
+    for task in tasks.values():
+        if task.get("status") not in ["completed", "cancelled"]:
+            a2a_client._run_in_background(cancel_and_record(task))
+
+async def cancel_and_record(task: dict):
+    """Cancel one sub-task; tasks the agent already finished (or never created) keep their status"""
+    
+    try:
+        await a2a_client.cancel_task(task["agent_id"], task["task_id"])
+    except Exception as e:
+        print(f"Cancel of {task['task_id']} on {task['agent_id']} skipped: {e}")
+        return
+    task["status"] = "cancelled"
 
 def get_required_skills_for_incident(incident_type: str) -> List[str]:
     """Get required skills based on incident type"""
@@ -189,9 +248,13 @@ def get_required_skills_for_incident(incident_type: str) -> List[str]:
     else:
         return ["general-support", "system-diagnostics"]
 
-async def execute_payment_failure_resolution(incident_id: str, incident_data: dict, agents: dict):
+async def execute_payment_failure_resolution(incident_id: str, incident_data: dict, agents: dict, deadline: Optional[float] = None):
     """Execute payment failure resolution using real agent calls"""
     
+    def hedge_candidates(candidates: List[str]) -> Optional[List[str]]:
+        # Only latency-critical incidents may send duplicate requests
+        return candidates if incident_data.get("latency_critical") else None
+    
     active_incidents[incident_id]["status"] = "executing_tasks"
     tasks = {}
     
@@ -201,6 +264,7 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
     # 1. Payment Analysis Task
     payment_agents = [aid for aid, info in agents.items() if "transaction-analysis" in info.get("skills", [])]
     if payment_agents:
+        selected_agent = a2a_client.select_agent(payment_agents)
         task_id = f"payment-analysis-{incident_id}"
         context = {
             "incident_id": incident_id,
@@ -213,13 +277,14 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         }
         
         task_coroutines.append(
-            execute_agent_task("payment_analysis", payment_agents[0], "transaction-analysis", context, task_id)
+            execute_agent_task("payment_analysis", selected_agent, "transaction-analysis", context, task_id, deadline, hedge_candidates(payment_agents))
         )
-        tasks["payment_analysis"] = {"agent_id": payment_agents[0], "task_id": task_id, "status": "created"}
+        tasks["payment_analysis"] = {"agent_id": selected_agent, "task_id": task_id, "status": "created"}
     
     # 2. Fraud Assessment Task  
     fraud_agents = [aid for aid, info in agents.items() if "risk-assessment" in info.get("skills", [])]
     if fraud_agents:
+        selected_agent = a2a_client.select_agent(fraud_agents)
         task_id = f"fraud-check-{incident_id}"
         context = {
             "incident_id": incident_id,
@@ -231,13 +296,14 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         }
         
         task_coroutines.append(
-            execute_agent_task("fraud_assessment", fraud_agents[0], "risk-assessment", context, task_id)
+            execute_agent_task("fraud_assessment", selected_agent, "risk-assessment", context, task_id, deadline, hedge_candidates(fraud_agents))
         )
-        tasks["fraud_assessment"] = {"agent_id": fraud_agents[0], "task_id": task_id, "status": "created"}
+        tasks["fraud_assessment"] = {"agent_id": selected_agent, "task_id": task_id, "status": "created"}
     
     # 3. Inventory Hold Task
     order_agents = [aid for aid, info in agents.items() if "inventory-hold" in info.get("skills", [])]
     if order_agents:
+        selected_agent = a2a_client.select_agent(order_agents)
         task_id = f"inventory-hold-{incident_id}"
         context = {
             "incident_id": incident_id,
@@ -248,13 +314,14 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         }
         
         task_coroutines.append(
-            execute_agent_task("inventory_hold", order_agents[0], "inventory-hold", context, task_id)
+            execute_agent_task("inventory_hold", selected_agent, "inventory-hold", context, task_id, deadline, hedge_candidates(order_agents))
         )
-        tasks["inventory_hold"] = {"agent_id": order_agents[0], "task_id": task_id, "status": "created"}
+        tasks["inventory_hold"] = {"agent_id": selected_agent, "task_id": task_id, "status": "created"}
     
     # 4. System Diagnostics Task
     tech_agents = [aid for aid, info in agents.items() if "system-diagnostics" in info.get("skills", [])]
     if tech_agents:
+        selected_agent = a2a_client.select_agent(tech_agents)
         task_id = f"system-diag-{incident_id}"
         context = {
             "incident_id": incident_id,
@@ -266,9 +333,9 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         }
         
         task_coroutines.append(
-            execute_agent_task("system_diagnostics", tech_agents[0], "system-diagnostics", context, task_id)
+            execute_agent_task("system_diagnostics", selected_agent, "system-diagnostics", context, task_id, deadline, hedge_candidates(tech_agents))
         )
-        tasks["system_diagnostics"] = {"agent_id": tech_agents[0], "task_id": task_id, "status": "created"}
+        tasks["system_diagnostics"] = {"agent_id": selected_agent, "task_id": task_id, "status": "created"}
     
     # Store initial task state
     active_incidents[incident_id]["tasks"] = tasks
@@ -284,6 +351,13 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
                 if isinstance(result, Exception):
                     tasks[task_names[i]]["status"] = "failed"
                     tasks[task_names[i]]["error"] = str(result)
+                elif result.get("status") == "timeout":
+                    tasks[task_names[i]]["status"] = "timeout"
+                    tasks[task_names[i]]["error"] = result.get("message", "Task timed out")
+                elif result.get("status") in ("failed", "cancelled"):
+                    # Finished on the agent without a result, e.g. its deadline or skill timeout hit
+                    tasks[task_names[i]]["status"] = result["status"]
+                    tasks[task_names[i]]["error"] = result.get("message", f"Task {result['status']}")
                 else:
                     tasks[task_names[i]]["status"] = "completed"
                     tasks[task_names[i]]["result"] = result
@@ -291,6 +365,9 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         # Update incident with completed tasks
         active_incidents[incident_id]["tasks"] = tasks
         
+        # Stop agents still working on sub-tasks we gave up on
+        cancel_outstanding_tasks(incident_id)
+        
         # Synthesize resolution from real results
         resolution = await synthesize_real_resolution(incident_id, tasks)
         active_incidents[incident_id]["resolution"] = resolution
@@ -300,12 +377,21 @@ async def execute_payment_failure_resolution(incident_id: str, incident_data: di
         active_incidents[incident_id]["status"] = "failed"
         active_incidents[incident_id]["error"] = "No suitable agents found for required tasks"
 
-async def execute_agent_task(task_name: str, agent_id: str, skill_name: str, context: dict, task_id: str):
-    """Execute a single agent task using real A2A communication"""
+async def execute_agent_task(task_name: str, 
+                             agent_id: str, 
+                             skill_name: str, 
+                             context: dict, 
+                             task_id: str, 
+                             deadline: Optional[float] = None,
+                             candidates: Optional[List[str]] = None):
+    """Execute a single agent task using real A2A communication, hedged across candidates if given"""
     
     try:
         print(f"Executing {task_name} with agent {agent_id}")
-        result = await a2a_client.call_agent(agent_id, skill_name, context, task_id)
+        if candidates and len(candidates) > 1:
+            result = await a2a_client.call_agent_hedged(agent_id, candidates, skill_name, context, task_id, deadline=deadline)
+        else:
+            result = await a2a_client.call_agent(agent_id, skill_name, context, task_id, deadline=deadline)
         print(f"Task {task_name} completed: {result}")
         return result
         
@@ -453,7 +539,11 @@ async def health_check():
         "status": "healthy",
         "timestamp": datetime.utcnow().isoformat(),
         "active_incidents": len(active_incidents),
-        "a2a_client": "connected"
+        "a2a_client": "connected",
+        "discovery_cache": a2a_client.get_cache_stats(),
+        "agents": a2a_client.get_resilience_stats(),
+        "hedging": a2a_client.get_hedging_stats(),
+        "event_streams": a2a_client.get_event_stream_stats()
     }
 
 if __name__ == "__main__":
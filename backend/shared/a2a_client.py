@@ -1,12 +1,18 @@
 import httpx
 import asyncio
 import json
+import random
+import time
 import uuid
+from collections import deque
+from contextlib import AsyncExitStack, asynccontextmanager
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set, Tuple
 from dataclasses import dataclass
 import logging
 
+from shared.load_balancer import SelectionPolicy, get_selection_policy
+
 # Setup logging for A2A traffic
 logger = logging.getLogger("a2a_traffic")
 logger.setLevel(logging.INFO)
@@ -61,100 +67,965 @@ class A2ATrafficMonitor:
         """Get recent traffic messages"""
         return self.traffic_log[-limit:]
 
+# Task statuses and stream events after which an agent task never changes again
+TERMINAL_TASK_STATUSES = ["completed", "failed", "cancelled"]
+TERMINAL_TASK_EVENTS = ["task_completed", "task_failed", "task_cancelled"]
+
+# JSON-RPC error agents return when a skill's worker pool is full
+TASK_OVERLOADED = -32003
+
 # Global traffic monitor instance
 traffic_monitor = A2ATrafficMonitor()
 
+class DiscoveryCache:
+    """Agent discovery cache with a skill -> agents inverted index and per-skill freshness"""
+    
+    def __init__(self, ttl: float = 300):
+        self.ttl = ttl
+        self.agents: Dict[str, dict] = {}
+        self.skill_index: Dict[str, Set[str]] = {}
+        
+        # Monotonic refresh times for the full agent set and for individual skills
+        self.full_refreshed_at: Optional[float] = None
+        self.skill_refreshed_at: Dict[str, float] = {}
+        
+        # Counters
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+    
+    def _refreshed_at(self, skill: Optional[str] = None) -> Optional[float]:
+        """When the given skill (or the full set if None) was last known to be complete"""
+        
+        times = []
+        if self.full_refreshed_at is not None:
+            times.append(self.full_refreshed_at)
+        if skill is not None and skill in self.skill_refreshed_at:
+            times.append(self.skill_refreshed_at[skill])
+        
+        return max(times) if times else None
+    
+    def lookup(self, required_skills: Optional[List[str]] = None) -> Optional[Tuple[Dict[str, dict], bool]]:
+        """Return (agents, is_stale) for the query, or None on a cache miss"""
+        
+        keys = list(required_skills) if required_skills else [None]
+        refreshed = [self._refreshed_at(skill) for skill in keys]
+        
+        if any(t is None for t in refreshed):
+            self.misses += 1
+            return None
+        
+        is_stale = time.monotonic() - min(refreshed) >= self.ttl
+        if is_stale:
+            self.stale_hits += 1
+        else:
+            self.hits += 1
+        
+        return self.filter(required_skills), is_stale
+    
+    def filter(self, required_skills: Optional[List[str]] = None) -> Dict[str, dict]:
+        """Agents offering any of the required skills, via the inverted index"""
+        
+        if not required_skills:
+            return dict(self.agents)
+        
+        agent_ids: Set[str] = set()
+        for skill in required_skills:
+            agent_ids |= self.skill_index.get(skill, set())
+        
+        return {agent_id: self.agents[agent_id] for agent_id in agent_ids if agent_id in self.agents}
+    
+    def get_agent(self, agent_id: str) -> Optional[dict]:
+        """Look up a single agent by id"""
+        
+        agent_info = self.agents.get(agent_id)
+        if agent_info is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return agent_info
+    
+    def is_full_set_stale(self) -> bool:
+        """True if a full refresh has happened but is older than the TTL"""
+        
+        return self.full_refreshed_at is not None and time.monotonic() - self.full_refreshed_at >= self.ttl
+    
+    def replace_all(self, agents: Dict[str, dict]):
+        """Replace the cache contents with a complete agent set"""
+        
+        self.agents = dict(agents)
+        self.skill_index = {}
+        for agent_id, agent_info in self.agents.items():
+            for skill in agent_info.get("skills", []):
+                self.skill_index.setdefault(skill, set()).add(agent_id)
+        
+        self.full_refreshed_at = time.monotonic()
+        self.skill_refreshed_at = {}
+        self.refreshes += 1
+    
+    def update_skills(self, required_skills: List[str], agents: Dict[str, dict]):
+        """Merge a skill-filtered discovery result without dropping other agents"""
+        
+        now = time.monotonic()
+        
+        for agent_id, agent_info in agents.items():
+            previous = self.agents.get(agent_id)
+            if previous:
+                for skill in previous.get("skills", []):
+                    self.skill_index.get(skill, set()).discard(agent_id)
+            self.agents[agent_id] = agent_info
+            for skill in agent_info.get("skills", []):
+                self.skill_index.setdefault(skill, set()).add(agent_id)
+        
+        # The result is authoritative for the queried skills
+        for skill in required_skills:
+            self.skill_index[skill] = {
+                agent_id for agent_id in self.skill_index.get(skill, set()) if agent_id in agents
+            }
+            self.skill_refreshed_at[skill] = now
+        
+        self.refreshes += 1
+    
+    def get_stats(self) -> dict:
+        """Cache counters and size"""
+        
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "agents": len(self.agents),
+            "skills": len(self.skill_index),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors
+        }
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the target's circuit breaker is open"""
+    pass
+
+class DeadlineExceededError(Exception):
+    """Raised when a call's deadline has passed before it could be sent"""
+    pass
+
+class BulkheadFullError(Exception):
+    """Raised when a target already has the maximum number of in-flight requests"""
+    pass
+
+class AgentOverloadedError(Exception):
+    """Raised when an agent keeps refusing a task because the skill's queue is full"""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Per-target circuit breaker driven by error rate and slow calls"""
+    
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+    
+    def __init__(self, 
+                 name: str,
+                 window_size: int = 20,
+                 min_calls: int = 5,
+                 failure_rate_threshold: float = 0.5,
+                 slow_call_threshold: float = 10.0,
+                 open_duration: float = 30.0,
+                 half_open_max_calls: int = 1,
+                 on_state_change=None):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_threshold = slow_call_threshold
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self.on_state_change = on_state_change
+        
+        self.state = self.CLOSED
+        self.outcomes: deque = deque(maxlen=window_size)  # True for failed or slow calls
+        self.state_changed_at = time.monotonic()
+        self.half_open_calls = 0
+        self.rejected = 0
+    
+    def allow_request(self) -> bool:
+        """Whether a call may proceed, moving from open to half-open after the cooldown"""
+        
+        now = time.monotonic()
+        
+        if self.state == self.OPEN:
+            if now - self.state_changed_at < self.open_duration:
+                self.rejected += 1
+                return False
+            self._transition(self.HALF_OPEN, "cooldown elapsed")
+        
+        if self.state == self.HALF_OPEN:
+            # Re-issue trial permits if earlier trials never reported back
+            if now - self.state_changed_at >= self.open_duration:
+                self.half_open_calls = 0
+                self.state_changed_at = now
+            if self.half_open_calls >= self.half_open_max_calls:
+                self.rejected += 1
+                return False
+            self.half_open_calls += 1
+        
+        return True
+    
+    def record_success(self, latency: float):
+        """Record a completed call; calls slower than slow_call_threshold count as failures"""
+        
+        if latency > self.slow_call_threshold:
+            self._record(True, f"slow call ({latency:.1f}s)")
+        else:
+            self._record(False, "trial call succeeded")
+    
+    def record_failure(self, reason: str = "call failed"):
+        """Record a failed call"""
+        self._record(True, reason)
+    
+    def _record(self, failed: bool, reason: str):
+        if self.state == self.HALF_OPEN:
+            self._transition(self.OPEN if failed else self.CLOSED, reason)
+            return
+        
+        self.outcomes.append(failed)
+        
+        if self.state == self.CLOSED and len(self.outcomes) >= self.min_calls:
+            failure_rate = sum(self.outcomes) / len(self.outcomes)
+            if failure_rate >= self.failure_rate_threshold:
+                self._transition(self.OPEN, f"failure rate {failure_rate:.0%} ({reason})")
+    
+    def _transition(self, new_state: str, reason: str):
+        old_state = self.state
+        self.state = new_state
+        self.state_changed_at = time.monotonic()
+        self.half_open_calls = 0
+        if new_state == self.CLOSED:
+            self.outcomes.clear()
+        
+        logger.info(f"Circuit breaker for {self.name}: {old_state} -> {new_state} ({reason})")
+        if self.on_state_change:
+            self.on_state_change(self, old_state, new_state, reason)
+    
+    def snapshot(self) -> dict:
+        """Serializable breaker state"""
+        return {
+            "state": self.state,
+            "failure_rate": sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0,
+            "window_calls": len(self.outcomes),
+            "rejected": self.rejected
+        }
+
+class Bulkhead:
+    """Caps the number of concurrent in-flight requests to one target"""
+    
+    def __init__(self, name: str, max_concurrent: int = 10, max_wait: float = 1.0):
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+    
+    @property
+    def outstanding(self) -> int:
+        """Requests either in flight or queued for a slot"""
+        return self.in_flight + self.waiting
+    
+    async def acquire(self, max_wait: Optional[float] = None):
+        """Take a slot, queueing up to `max_wait` seconds (default self.max_wait) for one"""
+        
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(
+                self._semaphore.acquire(), timeout=self.max_wait if max_wait is None else max_wait
+            )
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise BulkheadFullError(
+                f"Agent {self.name} already has {self.max_concurrent} requests in flight"
+            )
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+    
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+    
+    @asynccontextmanager
+    async def slot(self, max_wait: Optional[float] = None):
+        """Hold a slot for the duration of the block"""
+        
+        await self.acquire(max_wait)
+        try:
+            yield self
+        finally:
+            self.release()
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self.release()
+    
+    def snapshot(self) -> dict:
+        """Serializable bulkhead state"""
+        return {
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "rejected": self.rejected
+        }
+
+class HedgingBudget:
+    """Token bucket limiting hedged requests to a fraction of all requests for one skill"""
+    
+    def __init__(self, ratio: float = 0.1, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = burst
+        self.requests = 0
+        self.hedges = 0
+    
+    def record_request(self):
+        """Every request earns `ratio` of a hedge"""
+        self.requests += 1
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+    
+    def try_acquire(self) -> bool:
+        """Spend one token on a hedge if the budget allows it"""
+        
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        self.hedges += 1
+        return True
+
+class AgentEventStream:
+    """One multiplexed SSE connection to an agent, routing events to waiting callers
+    
+    Opens GET /stream?channel=<name> and keeps it open, reconnecting with
+    backoff. Tasks submitted with params.stream_channel set to `channel` have
+    their events delivered here and put on the queue registered for their
+    task_id. On reconnect the registered task ids are resubscribed so their
+    replay buffers cover anything missed while disconnected.
+    """
+    
+    def __init__(self, owner: "A2AClient", agent_id: str, endpoint: str):
+        self.owner = owner
+        self.agent_id = agent_id
+        self.endpoint = endpoint
+        self.channel = f"{owner.agent_id}-{uuid.uuid4().hex[:12]}"
+        self.waiters: Dict[str, asyncio.Queue] = {}
+        self.ready = asyncio.Event()
+        self.supported = True  # Cleared if the agent has no multiplexed stream endpoint
+        self.connect_timeout = 2.0
+        self.max_reconnect_delay = 5.0
+        self.reconnects = 0
+        self.first_attempt = asyncio.Event()  # Set once the first connection attempt succeeds or fails
+        self._runner: Optional[asyncio.Task] = None
+    
+    async def ensure_connected(self) -> bool:
+        """Start the connection if needed and wait briefly for the channel to open"""
+        
+        if not self.supported:
+            return False
+        if self.ready.is_set():
+            return True
+        if self._runner is None or self._runner.done():
+            self.first_attempt.clear()
+            self._runner = asyncio.create_task(self._run())
+        elif self.first_attempt.is_set():
+            # Reconnecting after a drop; don't stall callers on it
+            return False
+        
+        try:
+            await asyncio.wait_for(self.first_attempt.wait(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            return False
+        return self.ready.is_set()
+    
+    def register(self, task_id: str) -> asyncio.Queue:
+        """Start collecting events for a task; call before submitting it"""
+        return self.waiters.setdefault(task_id, asyncio.Queue())
+    
+    def unregister(self, task_id: str):
+        self.waiters.pop(task_id, None)
+    
+    async def _run(self):
+        delay = 0.1
+        
+        try:
+            while self.supported:
+                params = {"channel": self.channel}
+                if self.waiters:
+                    params["task_ids"] = ",".join(self.waiters)
+                
+                try:
+                    client = self.owner._get_http_client()
+                    async with client.stream(
+                        "GET", f"{self.endpoint}/stream", params=params, timeout=httpx.Timeout(10.0, read=None)
+                    ) as response:
+                        if response.status_code in (404, 405):
+                            logger.info(f"Agent {self.agent_id} has no multiplexed stream, using per-task streams")
+                            self.supported = False
+                            break
+                        if response.status_code != 200:
+                            raise Exception(f"Stream request failed with status {response.status_code}")
+                        
+                        async for event_type, data in self.owner._iter_sse_events(response):
+                            if event_type == "channel_open":
+                                self.ready.set()
+                                self.first_attempt.set()
+                                delay = 0.1
+                            elif event_type != "keepalive":
+                                waiter = self.waiters.get(data.get("task_id"))
+                                if waiter is not None:
+                                    waiter.put_nowait((event_type, data))
+                
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.info(f"Multiplexed stream to {self.agent_id} dropped: {e}")
+                
+                self.ready.clear()
+                self.first_attempt.set()
+                if not self.supported:
+                    break
+                self.reconnects += 1
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+        finally:
+            # Let waiters fall back instead of waiting for events that will never come,
+            # including when the connection is torn down by aclose()
+            self.ready.clear()
+            self.first_attempt.set()
+            for waiter in self.waiters.values():
+                waiter.put_nowait(("stream_closed", {}))
+    
+    async def aclose(self):
+        if self._runner is not None:
+            self._runner.cancel()
+            try:
+                await self._runner
+            except asyncio.CancelledError:
+                pass
+            self._runner = None
+        self.ready.clear()
+    
+    def snapshot(self) -> dict:
+        return {
+            "connected": self.ready.is_set(),
+            "supported": self.supported,
+            "waiting_tasks": len(self.waiters),
+            "reconnects": self.reconnects
+        }
+
+class TaskStatusPoller:
+    """Follows outstanding tasks on many agents with one batch status request per agent per round
+    
+    Each round asks every agent only for tasks changed since the version it
+    last reported, so unchanged tasks cost nothing. Tasks are dropped once
+    they reach a terminal status or the agent no longer knows them.
+    """
+    
+    def __init__(self, owner: "A2AClient", wait: float = 0.0):
+        self.owner = owner
+        self.wait = wait  # Long-poll each agent for up to this many seconds per round
+        self.tasks: Dict[str, Set[str]] = {}  # agent_id -> outstanding task ids
+        self.cursors: Dict[str, Tuple[str, int]] = {}  # agent_id -> (instance_id, version)
+    
+    def track(self, agent_id: str, task_id: str):
+        self.tasks.setdefault(agent_id, set()).add(task_id)
+        # The new task may predate the cursor; fetch everything for this agent once
+        self.cursors.pop(agent_id, None)
+    
+    def untrack(self, agent_id: str, task_id: str):
+        self.tasks.get(agent_id, set()).discard(task_id)
+    
+    def __len__(self) -> int:
+        return sum(len(task_ids) for task_ids in self.tasks.values())
+    
+    async def poll(self) -> Dict[str, Dict[str, dict]]:
+        """One round: changed task statuses by agent id and task id
+        
+        Unknown tasks are reported with status "unknown". Agents that fail
+        this round are skipped and retried on the next one.
+        """
+        
+        agent_ids = [agent_id for agent_id, task_ids in self.tasks.items() if task_ids]
+        results = await asyncio.gather(
+            *(self._poll_agent(agent_id) for agent_id in agent_ids), return_exceptions=True
+        )
+        
+        changes = {}
+        for agent_id, result in zip(agent_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Batch status poll of {agent_id} failed: {result}")
+            elif result:
+                changes[agent_id] = result
+        return changes
+    
+    async def _poll_agent(self, agent_id: str) -> Dict[str, dict]:
+        instance_id, version = self.cursors.get(agent_id, (None, None))
+        response = await self.owner.get_task_statuses(
+            agent_id, sorted(self.tasks[agent_id]), since_version=version, instance_id=instance_id, wait=self.wait
+        )
+        self.cursors[agent_id] = (response["instance_id"], response["version"])
+        
+        changed = {task["task_id"]: task for task in response["tasks"]}
+        for task_id in response["unknown"]:
+            changed[task_id] = {"task_id": task_id, "status": "unknown"}
+        
+        for task_id, task in changed.items():
+            if task["status"] in TERMINAL_TASK_STATUSES or task["status"] == "unknown":
+                self.untrack(agent_id, task_id)
+        return changed
+
 class A2AClient:
     """Client for making A2A calls to other agents"""
     
-    def __init__(self, agent_id: str, registry_url: str = "http://localhost:8000"):
+    def __init__(self, 
+                 agent_id: str, 
+                 registry_url: str = "http://localhost:8000",
+                 http2: bool = False,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0,
+                 selection_policy: Any = "power_of_two"):
         self.agent_id = agent_id
         self.registry_url = registry_url
-        self.agent_cache: Dict[str, dict] = {}
         self.cache_expiry = 300  # 5 minutes
-        self.last_cache_update = 0
+        self.request_timeout = 30.0  # Task submission
+        self.submit_retries = 2  # Safe because agents deduplicate on task_id
+        self.sync_wait = 10.0  # How long agents may hold POST /tasks to return the result inline
+        self.submit_retry_backoff = 0.2
+        self.overload_retries = 3  # Resubmissions after an agent sheds a task, honouring its retry_after
+        self.overload_rejections = 0
+        self.task_timeout = 120.0  # Waiting for task completion
+        self.discovery_cache = DiscoveryCache(ttl=self.cache_expiry)
+        self.card_fetch_concurrency = 20
+        self.card_fetch_timeout = 5.0
+        
+        # In-flight discovery and card requests shared by concurrent callers
+        self._inflight: Dict[tuple, asyncio.Task] = {}
+        self.coalesced_requests = 0
+        
+        # Per-target resilience: circuit breakers and bulkheads keyed by agent id
+        self.circuit_breaker_config: Dict[str, Any] = {}
+        self.bulkhead_max_concurrent = 10
+        self.bulkhead_max_wait = 30.0  # Longest a call queues for a slot, further capped by its deadline
+        self.circuit_breakers: Dict[str, CircuitBreaker] = {}
+        self.bulkheads: Dict[str, Bulkhead] = {}
+        
+        # Replica selection: policy plus observed call latency (EWMA, seconds) per agent
+        if isinstance(selection_policy, SelectionPolicy):
+            self.selection_policy = selection_policy
+        else:
+            self.selection_policy = get_selection_policy(selection_policy)
+        self.agent_latency: Dict[str, float] = {}
+        self.latency_smoothing = 0.3
+        
+        # Hedged requests: recent completion latencies and a hedge budget per skill
+        self.skill_latency: Dict[str, deque] = {}
+        self.hedge_min_samples = 10
+        self.hedge_budget_ratio = 0.1
+        self.hedging_budgets: Dict[str, HedgingBudget] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        
+        # One multiplexed SSE connection per agent carries events for all our tasks on it
+        self.multiplex_streams = True
+        self.event_streams: Dict[str, AgentEventStream] = {}
+        
+        # Shared connection pool, created lazily on first use so the client
+        # can be instantiated at import time outside of an event loop
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry
+        )
+        self._http_client: Optional[httpx.AsyncClient] = None
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Return the pooled HTTP client, creating it on first use"""
+        
+        if self._http_client is None or self._http_client.is_closed:
+            http2 = self.http2
+            if http2:
+                try:
+                    import h2  # noqa: F401
+                except ImportError:
+                    logger.warning("HTTP/2 requested but 'h2' is not installed, falling back to HTTP/1.1")
+                    http2 = False
+            
+            self._http_client = httpx.AsyncClient(
+                http2=http2,
+                limits=self.limits,
+                timeout=30.0
+            )
+        
+        return self._http_client
+    
+    async def aclose(self):
+        """Close the pooled HTTP client and release its connections"""
+        
+        for inflight_task in list(self._inflight.values()):
+            inflight_task.cancel()
+        self._inflight.clear()
+        
+        for event_stream in self.event_streams.values():
+            await event_stream.aclose()
+        self.event_streams.clear()
+        
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
     
     async def discover_agents(self, required_skills: List[str] = None) -> Dict[str, dict]:
         """Discover available agents, optionally filtered by skills"""
         
-        current_time = datetime.utcnow().timestamp()
-        
-        # Use cache if recent
-        if current_time - self.last_cache_update < self.cache_expiry and self.agent_cache:
-            return self._filter_agents_by_skills(self.agent_cache, required_skills)
+        # Serve from cache, revalidating in the background if stale
+        cached = self.discovery_cache.lookup(required_skills)
+        if cached is not None:
+            agents, is_stale = cached
+            if is_stale:
+                self._schedule_discovery_refresh(required_skills)
+            return agents
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                if required_skills:
-                    # Use skill-based discovery
-                    response = await client.post(
-                        f"{self.registry_url}/discover",
-                        json=required_skills
-                    )
-                    if response.status_code == 200:
-                        data = response.json()
-                        self.agent_cache = data.get("matching_agents", {})
-                else:
-                    # Get all agents
-                    response = await client.get(f"{self.registry_url}/.well-known/agents")
-                    if response.status_code == 200:
-                        agent_urls = response.json().get("agents", [])
-                        
-                        # Fetch agent cards
-                        agents = {}
-                        for agent_url in agent_urls:
-                            try:
-                                agent_response = await client.get(agent_url)
-                                if agent_response.status_code == 200:
-                                    agent_card = agent_response.json()
-                                    agents[agent_card["agent_id"]] = {
-                                        "name": agent_card["name"],
-                                        "endpoint": agent_card["endpoints"]["base_url"],
-                                        "skills": [s["name"] for s in agent_card["skills"]],
-                                        "capabilities": agent_card["capabilities"]
-                                    }
-                            except Exception as e:
-                                logger.warning(f"Failed to fetch agent card from {agent_url}: {e}")
-                        
-                        self.agent_cache = agents
-                
-                self.last_cache_update = current_time
-                return self._filter_agents_by_skills(self.agent_cache, required_skills)
-                
+            await self._refresh_discovery(required_skills)
         except Exception as e:
             logger.error(f"Agent discovery failed: {e}")
             return {}
+        
+        return self.discovery_cache.filter(required_skills)
     
-    def _filter_agents_by_skills(self, agents: Dict[str, dict], required_skills: List[str]) -> Dict[str, dict]:
-        """Filter agents by required skills"""
-        if not required_skills:
-            return agents
+    async def _single_flight(self, key: tuple, factory):
+        """Run factory() once per key; concurrent callers with the same key share its result"""
         
-        filtered = {}
-        for agent_id, agent_info in agents.items():
-            agent_skills = agent_info.get("skills", [])
-            if any(skill in agent_skills for skill in required_skills):
-                filtered[agent_id] = agent_info
+        # Shield so one cancelled waiter does not cancel the shared request
+        return await asyncio.shield(self._start_flight(key, factory))
+    
+    def _start_flight(self, key: tuple, factory) -> asyncio.Task:
+        """Return the in-flight task for key, starting factory() if there is none"""
+        
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._inflight[key] = task
+            
+            def cleanup(done: asyncio.Task):
+                if self._inflight.get(key) is done:
+                    del self._inflight[key]
+                # Mark the exception retrieved in case every waiter went away
+                if not done.cancelled():
+                    done.exception()
+            
+            task.add_done_callback(cleanup)
+        else:
+            self.coalesced_requests += 1
+        
+        return task
+    
+    @staticmethod
+    def _discovery_key(required_skills: Optional[List[str]] = None) -> tuple:
+        return ("discover",) + tuple(sorted(set(required_skills or [])))
+    
+    async def _refresh_discovery(self, required_skills: Optional[List[str]] = None):
+        """Fetch agents from the registry, coalescing identical concurrent queries"""
+        
+        await self._single_flight(
+            self._discovery_key(required_skills),
+            lambda: self._fetch_discovery(required_skills)
+        )
+    
+    async def _fetch_discovery(self, required_skills: Optional[List[str]] = None):
+        """Fetch agents from the registry and update the discovery cache"""
+        
+        try:
+            client = self._get_http_client()
+            if required_skills:
+                # Use skill-based discovery
+                response = await client.post(
+                    f"{self.registry_url}/discover",
+                    json=required_skills,
+                    timeout=10.0
+                )
+                if response.status_code != 200:
+                    raise Exception(f"Registry discovery failed with status {response.status_code}")
+                
+                data = response.json()
+                self.discovery_cache.update_skills(required_skills, data.get("matching_agents", {}))
+            else:
+                # Get all agents
+                response = await client.get(f"{self.registry_url}/.well-known/agents", timeout=10.0)
+                if response.status_code != 200:
+                    raise Exception(f"Registry listing failed with status {response.status_code}")
+                
+                agent_urls = response.json().get("agents", [])
+                
+                # Fetch agent cards concurrently, bounded by card_fetch_concurrency
+                semaphore = asyncio.Semaphore(self.card_fetch_concurrency)
+                cards = await asyncio.gather(*(
+                    self._fetch_agent_card(agent_url, semaphore) for agent_url in agent_urls
+                ))
+                
+                self.discovery_cache.replace_all(dict(card for card in cards if card is not None))
+        except Exception:
+            self.discovery_cache.refresh_errors += 1
+            raise
+    
+    async def _fetch_agent_card(self, agent_url: str, semaphore: asyncio.Semaphore) -> Optional[Tuple[str, dict]]:
+        """Fetch one agent card, coalescing concurrent fetches of the same URL"""
+        
+        return await self._single_flight(
+            ("card", agent_url),
+            lambda: self._load_agent_card(agent_url, semaphore)
+        )
+    
+    async def _load_agent_card(self, agent_url: str, semaphore: asyncio.Semaphore) -> Optional[Tuple[str, dict]]:
+        """Fetch one agent card as (agent_id, agent_info), giving up after card_fetch_timeout"""
+        
+        async with semaphore:
+            try:
+                client = self._get_http_client()
+                agent_response = await asyncio.wait_for(
+                    client.get(agent_url, timeout=self.card_fetch_timeout),
+                    timeout=self.card_fetch_timeout
+                )
+                if agent_response.status_code == 200:
+                    agent_card = agent_response.json()
+                    return agent_card["agent_id"], {
+                        "name": agent_card["name"],
+                        "endpoint": agent_card["endpoints"]["base_url"],
+                        "skills": [s["name"] for s in agent_card["skills"]],
+                        "capabilities": agent_card["capabilities"]
+                    }
+                logger.warning(f"Agent card fetch from {agent_url} returned {agent_response.status_code}")
+            except Exception as e:
+                logger.warning(f"Failed to fetch agent card from {agent_url}: {e!r}")
         
-        return filtered
+        return None
+    
+    def _schedule_discovery_refresh(self, required_skills: Optional[List[str]] = None):
+        """Revalidate a stale discovery query in the background, once per query"""
+        
+        key = self._discovery_key(required_skills)
+        if key in self._inflight:
+            return
+        
+        async def refresh():
+            try:
+                await self._fetch_discovery(required_skills)
+            except Exception as e:
+                logger.warning(f"Background agent discovery refresh failed: {e}")
+        
+        self._start_flight(key, refresh)
+    
+    async def _resolve_agent(self, agent_id: str) -> Optional[dict]:
+        """Look up one agent, falling back to a full discovery on a miss"""
+        
+        agent_info = self.discovery_cache.get_agent(agent_id)
+        if agent_info is not None:
+            if self.discovery_cache.is_full_set_stale():
+                self._schedule_discovery_refresh()
+            return agent_info
+        
+        await self.discover_agents()
+        return self.discovery_cache.agents.get(agent_id)
+    
+    def get_cache_stats(self) -> dict:
+        """Discovery cache hit/miss counters"""
+        
+        stats = self.discovery_cache.get_stats()
+        stats["coalesced_requests"] = self.coalesced_requests
+        stats["inflight_requests"] = len(self._inflight)
+        return stats
+    
+    def _get_circuit_breaker(self, agent_id: str) -> CircuitBreaker:
+        """Return the circuit breaker for an agent, creating it on first use"""
+        
+        if agent_id not in self.circuit_breakers:
+            self.circuit_breakers[agent_id] = CircuitBreaker(
+                agent_id,
+                on_state_change=self._log_circuit_state_change,
+                **self.circuit_breaker_config
+            )
+        return self.circuit_breakers[agent_id]
+    
+    def _get_bulkhead(self, agent_id: str) -> Bulkhead:
+        """Return the bulkhead for an agent, creating it on first use"""
+        
+        if agent_id not in self.bulkheads:
+            self.bulkheads[agent_id] = Bulkhead(
+                agent_id,
+                max_concurrent=self.bulkhead_max_concurrent,
+                max_wait=self.bulkhead_max_wait
+            )
+        return self.bulkheads[agent_id]
+    
+    def _bulkhead_slot(self, agent_id: str, deadline: Optional[float] = None):
+        """Hold a slot in an agent's bulkhead, queueing for one within the caller's budget"""
+        return self._get_bulkhead(agent_id).slot(self._budgeted_timeout(self.bulkhead_max_wait, deadline))
+    
+    def _log_circuit_state_change(self, breaker: CircuitBreaker, old_state: str, new_state: str, reason: str):
+        """Surface circuit breaker transitions in the traffic monitor"""
+        
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=datetime.utcnow().isoformat(),
+            source_agent=self.agent_id,
+            target_agent=breaker.name,
+            message_type="circuit_breaker",
+            method="state_change",
+            message_id=f"circuit-{breaker.name}-{uuid.uuid4().hex[:8]}",
+            content={
+                "agent_id": breaker.name,
+                "from_state": old_state,
+                "to_state": new_state,
+                "reason": reason
+            }
+        ))
+    
+    @staticmethod
+    def _remaining_budget(deadline: Optional[float]) -> Optional[float]:
+        """Seconds left until an absolute epoch deadline, floored at 0 (None if no deadline)"""
+        
+        if deadline is None:
+            return None
+        return max(deadline - time.time(), 0.0)
+    
+    def _budgeted_timeout(self, default: float, deadline: Optional[float]) -> float:
+        """A timeout shrunk to the remaining deadline budget"""
+        
+        remaining = self._remaining_budget(deadline)
+        return default if remaining is None else min(default, remaining)
+    
+    def _record_latency(self, agent_id: str, latency: float):
+        """Fold one observed call latency into the agent's moving average"""
+        
+        previous = self.agent_latency.get(agent_id)
+        if previous is None:
+            self.agent_latency[agent_id] = latency
+        else:
+            self.agent_latency[agent_id] = previous + self.latency_smoothing * (latency - previous)
+    
+    def get_agent_load(self, agent_ids: List[str]) -> Dict[str, dict]:
+        """Live outstanding request counts and observed latency for the given agents"""
+        
+        return {
+            agent_id: {
+                "in_flight": self.bulkheads[agent_id].outstanding if agent_id in self.bulkheads else 0,
+                "latency": self.agent_latency.get(agent_id)
+            }
+            for agent_id in agent_ids
+        }
+    
+    def select_agent(self, candidates: List[str]) -> Optional[str]:
+        """Pick one replica from agents offering the same skill using the selection policy"""
+        
+        # Skip agents whose circuit is open unless nothing else is left
+        available = [
+            agent_id for agent_id in candidates
+            if agent_id not in self.circuit_breakers
+            or self.circuit_breakers[agent_id].state != CircuitBreaker.OPEN
+        ]
+        if not available:
+            available = list(candidates)
+        
+        return self.selection_policy.select(available, self.get_agent_load(available))
+    
+    def get_hedging_stats(self) -> dict:
+        """Hedge counts and p95 latency per skill"""
+        
+        return {
+            skill_name: {
+                "requests": budget.requests,
+                "hedges": budget.hedges,
+                "p95_latency": self.get_skill_latency_percentile(skill_name, 0.95)
+            }
+            for skill_name, budget in self.hedging_budgets.items()
+        }
+    
+    def get_resilience_stats(self) -> dict:
+        """Circuit breaker and bulkhead state per target agent"""
+        
+        agent_ids = set(self.circuit_breakers) | set(self.bulkheads)
+        return {
+            agent_id: {
+                "circuit_breaker": self.circuit_breakers[agent_id].snapshot() if agent_id in self.circuit_breakers else None,
+                "bulkhead": self.bulkheads[agent_id].snapshot() if agent_id in self.bulkheads else None,
+                "latency": self.agent_latency.get(agent_id)
+            }
+            for agent_id in sorted(agent_ids | set(self.agent_latency))
+        }
     
     async def call_agent(self, 
                         target_agent_id: str, 
                         skill_name: str, 
                         context: dict, 
-                        task_id: str = None) -> dict:
-        """Make a JSON-RPC call to another agent"""
+                        task_id: str = None,
+                        deadline: Optional[float] = None) -> dict:
+        """Make a JSON-RPC call to another agent
+        
+        `deadline` is an absolute epoch time (time.time()). The remaining budget
+        is sent to the agent as params.timeout_ms and caps the local timeouts.
+        """
         
         if task_id is None:
             task_id = str(uuid.uuid4())
         
+        if self._remaining_budget(deadline) == 0:
+            raise DeadlineExceededError(f"Deadline passed before calling {target_agent_id}")
+        
         # Get agent endpoint
-        agents = await self.discover_agents()
-        if target_agent_id not in agents:
+        agent_info = await self._resolve_agent(target_agent_id)
+        if agent_info is None:
             raise Exception(f"Agent {target_agent_id} not found")
         
-        agent_endpoint = agents[target_agent_id]["endpoint"]
+        # Fail fast while the target's circuit is open
+        breaker = self._get_circuit_breaker(target_agent_id)
+        if not breaker.allow_request():
+            traffic_monitor.log_message(A2AMessage(
+                timestamp=datetime.utcnow().isoformat(),
+                source_agent=target_agent_id,
+                target_agent=self.agent_id,
+                message_type="error",
+                method=skill_name,
+                message_id=str(uuid.uuid4()),
+                content={"error": "circuit_open", "task_id": task_id}
+            ))
+            raise CircuitOpenError(f"Circuit open for agent {target_agent_id}")
+        
+        async with self._bulkhead_slot(target_agent_id, deadline):
+            call_start = time.monotonic()
+            result = await self._send_task(target_agent_id, agent_info, skill_name, context, task_id, breaker, deadline)
+            elapsed = time.monotonic() - call_start
+            self._record_latency(target_agent_id, elapsed)
+            if result.get("status") == "completed":
+                self.skill_latency.setdefault(skill_name, deque(maxlen=200)).append(elapsed)
+            return result
+    
+    async def _send_task(self, 
+                         target_agent_id: str, 
+                         agent_info: dict, 
+                         skill_name: str, 
+                         context: dict, 
+                         task_id: str,
+                         breaker: CircuitBreaker,
+                         deadline: Optional[float] = None) -> dict:
+        """Submit one task to an agent and wait for its result"""
+        
+        agent_endpoint = agent_info["endpoint"]
         request_id = str(uuid.uuid4())
+        remaining = self._remaining_budget(deadline)
         
         # Prepare JSON-RPC request
         request_data = {
@@ -166,6 +1037,16 @@ class A2AClient:
             },
             "id": request_id
         }
+        if remaining is not None:
+            request_data["params"]["timeout_ms"] = int(remaining * 1000)
+        
+        # Route the task's events over our shared connection to this agent
+        streaming = agent_info.get("capabilities", {}).get("streaming", False)
+        event_stream = await self._get_event_stream(target_agent_id, agent_endpoint) if streaming else None
+        events = None
+        if event_stream is not None:
+            request_data["params"]["stream_channel"] = event_stream.channel
+            events = event_stream.register(task_id)
         
         start_time = datetime.utcnow()
         
@@ -181,50 +1062,93 @@ class A2AClient:
         ))
         
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                # Make the actual HTTP call
-                response = await client.post(
-                    f"{agent_endpoint}/tasks",
-                    json=request_data,
-                    headers={"Content-Type": "application/json"}
+            overload_attempts = 0
+            while True:
+                # Make the actual HTTP call, letting the agent answer inline if it finishes quickly.
+                # Hold for at most half the remaining budget so the reply beats our own timeout.
+                remaining = self._remaining_budget(deadline)
+                if remaining is not None:
+                    request_data["params"]["timeout_ms"] = int(remaining * 1000)
+                sync_wait = self.sync_wait if remaining is None else min(self.sync_wait, remaining / 2)
+                start_time = datetime.utcnow()
+                response = await self._post_task_request(
+                    f"{agent_endpoint}/tasks", request_data, deadline, [breaker], sync_wait
                 )
                 
-                end_time = datetime.utcnow()
-                latency = (end_time - start_time).total_seconds() * 1000
-                
-                response_data = response.json() if response.status_code == 200 else {
-                    "error": {"code": response.status_code, "message": response.text}
-                }
+                # A full skill queue is back-pressure, not a fault: wait as advised and resubmit
+                error = response.json().get("error") if response.status_code == 200 else None
+                if not error or error.get("code") != TASK_OVERLOADED:
+                    break
+                self.overload_rejections += 1
+                delay = self._overload_backoff(error, deadline)
+                if overload_attempts >= self.overload_retries or delay is None:
+                    raise AgentOverloadedError(
+                        f"Agent {target_agent_id} overloaded: {error.get('message')}",
+                        (error.get("data") or {}).get("retry_after")
+                    )
+                overload_attempts += 1
+                logger.info(f"Agent {target_agent_id} overloaded, resubmitting {task_id} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            
+            end_time = datetime.utcnow()
+            latency = (end_time - start_time).total_seconds() * 1000
+            
+            if response.status_code == 200:
+                # Time the agent spent holding the response is not slowness
+                breaker.record_success(max(latency / 1000 - self._server_hold_time(response), 0.0))
+            else:
+                breaker.record_failure(f"HTTP {response.status_code}")
+            
+            response_data = response.json() if response.status_code == 200 else {
+                "error": {"code": response.status_code, "message": response.text}
+            }
+            
+            # Log response
+            traffic_monitor.log_message(A2AMessage(
+                timestamp=end_time.isoformat(),
+                source_agent=target_agent_id,
+                target_agent=self.agent_id,
+                message_type="response" if response.status_code == 200 else "error",
+                method=skill_name,
+                message_id=request_id,
+                content=response_data,
+                latency_ms=latency
+            ))
+            
+            if response.status_code == 200 and response_data.get("error"):
+                raise Exception(f"Agent call failed: {response_data['error']}")
+            
+            if response.status_code == 200:
+                result = response_data.get("result", {})
+                returned_task_id = result.get("task_id")
                 
-                # Log response
-                traffic_monitor.log_message(A2AMessage(
-                    timestamp=end_time.isoformat(),
-                    source_agent=target_agent_id,
-                    target_agent=self.agent_id,
-                    message_type="response" if response.status_code == 200 else "error",
-                    method=skill_name,
-                    message_id=request_id,
-                    content=response_data,
-                    latency_ms=latency
-                ))
+                if returned_task_id and result.get("status") in TERMINAL_TASK_STATUSES:
+                    # Finished inline (or a duplicate of a finished task): result is the final TaskStatus
+                    return result
                 
-                if response.status_code == 200:
-                    result = response_data.get("result", {})
-                    returned_task_id = result.get("task_id")
-                    
-                    if returned_task_id:
-                        # Monitor task completion
-                        final_result = await self._monitor_task_completion(
-                            target_agent_id, 
-                            returned_task_id,
-                            agent_endpoint
-                        )
-                        return final_result
-                    else:
-                        return result
+                if returned_task_id:
+                    # Monitor task completion, streaming when the agent supports it
+                    max_wait = self._budgeted_timeout(self.task_timeout, deadline)
+                    final_result = await self._monitor_task_completion(
+                        target_agent_id, 
+                        returned_task_id,
+                        agent_endpoint,
+                        streaming,
+                        max_wait,
+                        events if returned_task_id == task_id else None
+                    )
+                    if final_result.get("status") == "timeout":
+                        if max_wait < self.task_timeout:
+                            # Our own budget ran out; not the agent's fault
+                            final_result["message"] = "Deadline exceeded while waiting for task"
+                        else:
+                            breaker.record_failure("task monitoring timed out")
+                    return final_result
                 else:
-                    raise Exception(f"Agent call failed: {response_data}")
-                    
+                    return result
+            else:
+                raise Exception(f"Agent call failed: {response_data}")
+        
         except Exception as e:
             # Log error
             traffic_monitor.log_message(A2AMessage(
@@ -237,46 +1161,814 @@ class A2AClient:
                 content={"error": str(e)}
             ))
             raise
+        
+        finally:
+            if event_stream is not None:
+                event_stream.unregister(task_id)
+    
+    async def _get_event_stream(self, agent_id: str, agent_endpoint: str) -> Optional[AgentEventStream]:
+        """The open multiplexed stream to an agent, or None to use per-task streams"""
+        
+        if not self.multiplex_streams:
+            return None
+        
+        event_stream = self.event_streams.get(agent_id)
+        if event_stream is None or event_stream.endpoint != agent_endpoint:
+            if event_stream is not None:
+                await event_stream.aclose()
+            event_stream = self.event_streams[agent_id] = AgentEventStream(self, agent_id, agent_endpoint)
+        
+        return event_stream if await event_stream.ensure_connected() else None
+    
+    def get_event_stream_stats(self) -> dict:
+        return {agent_id: event_stream.snapshot() for agent_id, event_stream in self.event_streams.items()}
+    
+    def get_skill_latency_percentile(self, skill_name: str, percentile: float = 0.95) -> Optional[float]:
+        """Observed completion latency percentile for a skill, or None without enough samples"""
+        
+        samples = self.skill_latency.get(skill_name)
+        if not samples or len(samples) < self.hedge_min_samples:
+            return None
+        
+        ordered = sorted(samples)
+        return ordered[int(percentile * (len(ordered) - 1))]
+    
+    async def call_agent_hedged(self, 
+                                primary_agent_id: str, 
+                                candidates: List[str], 
+                                skill_name: str, 
+                                context: dict, 
+                                task_id: str = None,
+                                deadline: Optional[float] = None) -> dict:
+        """Call an agent, hedging with a second replica if it runs past the skill's p95
+        
+        The first attempt to complete successfully wins; the other one is
+        cancelled locally and on its agent. Hedges are limited per skill by a
+        HedgingBudget so the extra load stays bounded.
+        """
+        
+        if task_id is None:
+            task_id = str(uuid.uuid4())
+        
+        budget = self.hedging_budgets.setdefault(skill_name, HedgingBudget(ratio=self.hedge_budget_ratio))
+        budget.record_request()
+        
+        primary = asyncio.create_task(
+            self.call_agent(primary_agent_id, skill_name, context, task_id, deadline=deadline)
+        )
+        attempts: Dict[asyncio.Task, Tuple[str, str]] = {primary: (primary_agent_id, task_id)}
+        
+        try:
+            hedge_delay = self.get_skill_latency_percentile(skill_name, 0.95)
+            if hedge_delay is not None:
+                done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+                backups = [agent_id for agent_id in candidates if agent_id != primary_agent_id]
+                if not done and backups and budget.try_acquire():
+                    backup_agent_id = self.select_agent(backups)
+                    hedge_task_id = f"{task_id}-hedge"
+                    
+                    traffic_monitor.log_message(A2AMessage(
+                        timestamp=datetime.utcnow().isoformat(),
+                        source_agent=self.agent_id,
+                        target_agent=backup_agent_id,
+                        message_type="hedge",
+                        method=skill_name,
+                        message_id=hedge_task_id,
+                        content={
+                            "primary_agent": primary_agent_id,
+                            "primary_task_id": task_id,
+                            "hedge_task_id": hedge_task_id,
+                            "hedge_delay_ms": hedge_delay * 1000
+                        }
+                    ))
+                    
+                    hedge = asyncio.create_task(
+                        self.call_agent(backup_agent_id, skill_name, context, hedge_task_id, deadline=deadline)
+                    )
+                    attempts[hedge] = (backup_agent_id, hedge_task_id)
+            
+            # First successful completion wins
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if not attempt.cancelled() and attempt.exception() is None \
+                            and attempt.result().get("status") == "completed":
+                        return attempt.result()
+            
+            # Nothing succeeded: report the primary's outcome
+            return primary.result()
+        
+        finally:
+            for attempt, (agent_id, attempt_task_id) in attempts.items():
+                if not attempt.done():
+                    attempt.cancel()
+                    self._run_in_background(self._cancel_task_quietly(agent_id, attempt_task_id))
+    
+    def _run_in_background(self, coroutine):
+        """Run a fire-and-forget coroutine, keeping a reference until it finishes"""
+        
+        task = asyncio.create_task(coroutine)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+    
+    async def _cancel_task_quietly(self, target_agent_id: str, task_id: str):
+        """cancel_task for cleanup paths where failure is not actionable"""
+        
+        try:
+            await self.cancel_task(target_agent_id, task_id)
+        except Exception as e:
+            logger.info(f"Cancel of {task_id} on {target_agent_id} skipped: {e}")
+    
+    async def cancel_task(self, target_agent_id: str, task_id: str) -> dict:
+        """Ask an agent to cancel one of its tasks and return the task's final status"""
+        
+        agent_info = await self._resolve_agent(target_agent_id)
+        if agent_info is None:
+            raise Exception(f"Agent {target_agent_id} not found")
+        
+        request_id = f"cancel-{task_id}"
+        start_time = datetime.utcnow()
+        
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=start_time.isoformat(),
+            source_agent=self.agent_id,
+            target_agent=target_agent_id,
+            message_type="request",
+            method="cancel_task",
+            message_id=request_id,
+            content={"task_id": task_id}
+        ))
+        
+        client = self._get_http_client()
+        response = await client.post(
+            f"{agent_info['endpoint']}/tasks/{task_id}/cancel",
+            timeout=self.request_timeout
+        )
+        
+        end_time = datetime.utcnow()
+        response_data = response.json() if response.status_code in (200, 404, 409) else {"detail": response.text}
+        
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=end_time.isoformat(),
+            source_agent=target_agent_id,
+            target_agent=self.agent_id,
+            message_type="response" if response.status_code == 200 else "error",
+            method="cancel_task",
+            message_id=request_id,
+            content=response_data,
+            latency_ms=(end_time - start_time).total_seconds() * 1000
+        ))
+        
+        if response.status_code != 200:
+            raise Exception(f"Cancel of task {task_id} failed: {response_data}")
+        
+        return response_data
+    
+    async def get_task_statuses(self, 
+                                target_agent_id: str, 
+                                task_ids: List[str], 
+                                since_version: Optional[int] = None,
+                                instance_id: Optional[str] = None,
+                                wait: float = 0.0) -> dict:
+        """Fetch many task statuses from one agent in a single request
+        
+        Returns the agent's {"instance_id", "version", "tasks", "unknown"}.
+        With since_version (and the instance_id it came from) only tasks
+        changed since then are returned; see TaskStatusPoller for tracking
+        tasks across rounds and agents.
+        """
+        
+        agent_info = await self._resolve_agent(target_agent_id)
+        if agent_info is None:
+            raise Exception(f"Agent {target_agent_id} not found")
+        
+        start_time = datetime.utcnow()
+        response = await self._get_http_client().post(
+            f"{agent_info['endpoint']}/tasks/status",
+            json={
+                "task_ids": task_ids,
+                "since_version": since_version,
+                "instance_id": instance_id,
+                "wait": wait
+            },
+            timeout=wait + 5.0
+        )
+        
+        if response.status_code != 200:
+            raise Exception(f"Batch status request to {target_agent_id} failed: {response.status_code} {response.text}")
+        
+        response_data = response.json()
+        if response_data["tasks"]:
+            traffic_monitor.log_message(A2AMessage(
+                timestamp=datetime.utcnow().isoformat(),
+                source_agent=target_agent_id,
+                target_agent=self.agent_id,
+                message_type="progress",
+                method="task_status_batch",
+                message_id=f"status-batch-{response_data['version']}",
+                content=response_data,
+                latency_ms=(datetime.utcnow() - start_time).total_seconds() * 1000
+            ))
+        return response_data
+    
+    def task_status_poller(self, wait: float = 0.0) -> TaskStatusPoller:
+        """A poller that batches status checks for outstanding tasks per agent"""
+        return TaskStatusPoller(self, wait)
+    
+    async def stream_agent_task(self, 
+                                target_agent_id: str, 
+                                skill_name: str, 
+                                context: dict, 
+                                task_id: str = None,
+                                deadline: Optional[float] = None):
+        """Submit a task and stream its events over the same connection
+        
+        Yields (event, data) pairs: "task_accepted" (or "task_rejected") first,
+        then every progress, insight and artifact_ready event, ending with the
+        terminal task event. Saves the separate /stream round trip. A task
+        refused because the skill's queue is full is resubmitted after the
+        agent's retry_after, as call_agent does.
+        """
+        
+        if task_id is None:
+            task_id = str(uuid.uuid4())
+        
+        remaining = self._remaining_budget(deadline)
+        if remaining == 0:
+            raise DeadlineExceededError(f"Deadline passed before calling {target_agent_id}")
+        
+        agent_info = await self._resolve_agent(target_agent_id)
+        if agent_info is None:
+            raise Exception(f"Agent {target_agent_id} not found")
+        
+        breaker = self._get_circuit_breaker(target_agent_id)
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Circuit open for agent {target_agent_id}")
+        
+        request_id = str(uuid.uuid4())
+        request_data = {
+            "jsonrpc": "2.0",
+            "method": skill_name,
+            "params": {
+                "task_id": task_id,
+                "context": context
+            },
+            "id": request_id
+        }
+        if remaining is not None:
+            request_data["params"]["timeout_ms"] = int(remaining * 1000)
+        
+        start_time = datetime.utcnow()
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=start_time.isoformat(),
+            source_agent=self.agent_id,
+            target_agent=target_agent_id,
+            message_type="request",
+            method=skill_name,
+            message_id=request_id,
+            content=request_data
+        ))
+        
+        client = self._get_http_client()
+        
+        async with self._bulkhead_slot(target_agent_id, deadline):
+            call_start = time.monotonic()
+            overload_attempts = 0
+            while True:
+                remaining = self._remaining_budget(deadline)
+                if remaining is not None:
+                    request_data["params"]["timeout_ms"] = int(remaining * 1000)
+                # Events may be far apart, so reads are bounded only by the deadline
+                timeout = httpx.Timeout(self._budgeted_timeout(self.request_timeout, deadline), read=remaining)
+                submit_start = time.monotonic()
+                overload_error = None
+                
+                try:
+                    async with client.stream(
+                        "POST", f"{agent_info['endpoint']}/tasks/stream", json=request_data, timeout=timeout
+                    ) as response:
+                        if response.status_code != 200:
+                            await response.aread()
+                            breaker.record_failure(f"HTTP {response.status_code}")
+                            raise Exception(f"Agent call failed: {response.text}")
+                        
+                        async for event_type, data in self._iter_sse_events(response):
+                            if event_type == "task_rejected":
+                                error = data.get("error") or {}
+                                if error.get("code") == TASK_OVERLOADED:
+                                    # Back-pressure, not a fault: resubmit once the connection is closed
+                                    overload_error = error
+                                    break
+                                # The agent answered; a refused task says nothing about its health
+                                traffic_monitor.log_message(A2AMessage(
+                                    timestamp=datetime.utcnow().isoformat(),
+                                    source_agent=target_agent_id,
+                                    target_agent=self.agent_id,
+                                    message_type="error",
+                                    method=skill_name,
+                                    message_id=request_id,
+                                    content={"event": event_type, "data": data},
+                                    latency_ms=(time.monotonic() - submit_start) * 1000
+                                ))
+                            elif event_type == "task_accepted":
+                                # Time spent running the task afterwards is not slowness
+                                breaker.record_success(time.monotonic() - submit_start)
+                            elif event_type in TERMINAL_TASK_EVENTS:
+                                elapsed = time.monotonic() - call_start
+                                self._record_latency(target_agent_id, elapsed)
+                                traffic_monitor.log_message(A2AMessage(
+                                    timestamp=datetime.utcnow().isoformat(),
+                                    source_agent=target_agent_id,
+                                    target_agent=self.agent_id,
+                                    message_type="response",
+                                    method=skill_name,
+                                    message_id=request_id,
+                                    content={"event": event_type, "data": data},
+                                    latency_ms=elapsed * 1000
+                                ))
+                            yield event_type, data
+                
+                except httpx.TransportError as e:
+                    traffic_monitor.log_message(A2AMessage(
+                        timestamp=datetime.utcnow().isoformat(),
+                        source_agent=target_agent_id,
+                        target_agent=self.agent_id,
+                        message_type="error",
+                        method=skill_name,
+                        message_id=request_id,
+                        content={"error": str(e)}
+                    ))
+                    if isinstance(e, httpx.ReadTimeout) and remaining is not None:
+                        # Reads wait up to the whole remaining budget, so our own deadline ran out
+                        raise DeadlineExceededError(
+                            f"Deadline exceeded while streaming task {task_id} from {target_agent_id}"
+                        ) from e
+                    breaker.record_failure(f"{type(e).__name__}: {e}")
+                    raise
+                
+                if overload_error is None:
+                    return
+                
+                self.overload_rejections += 1
+                delay = self._overload_backoff(overload_error, deadline)
+                if overload_attempts >= self.overload_retries or delay is None:
+                    raise AgentOverloadedError(
+                        f"Agent {target_agent_id} overloaded: {overload_error.get('message')}",
+                        (overload_error.get("data") or {}).get("retry_after")
+                    )
+                overload_attempts += 1
+                logger.info(f"Agent {target_agent_id} overloaded, resubmitting {task_id} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+    
+    async def _post_task_request(self, 
+                                 url: str, 
+                                 request_data: Any, 
+                                 deadline: Optional[float], 
+                                 breakers: List[CircuitBreaker],
+                                 sync_wait: float = 0.0) -> httpx.Response:
+        """POST a task submission, retrying transport errors
+        
+        Retrying is safe because every request carries its task_id and agents
+        return the existing task for a repeated submission.
+        """
+        
+        client = self._get_http_client()
+        attempt = 0
+        
+        while True:
+            try:
+                return await client.post(
+                    url,
+                    json=request_data,
+                    params={"wait": sync_wait} if sync_wait > 0 else None,
+                    headers={"Content-Type": "application/json"},
+                    timeout=self._budgeted_timeout(self.request_timeout + sync_wait, deadline)
+                )
+            except httpx.TransportError as e:
+                for breaker in breakers:
+                    breaker.record_failure(f"transport error: {e!r}")
+                
+                attempt += 1
+                backoff = self.submit_retry_backoff * attempt
+                remaining = self._remaining_budget(deadline)
+                if attempt > self.submit_retries or (remaining is not None and remaining <= backoff):
+                    raise
+                
+                logger.warning(f"Retrying task submission to {url} after {e!r} (attempt {attempt})")
+                await asyncio.sleep(backoff)
+    
+    @staticmethod
+    def _server_hold_time(response: httpx.Response) -> float:
+        """Seconds the agent held a response waiting for an inline result, from its Server-Timing header"""
+        
+        for metric in response.headers.get("server-timing", "").split(","):
+            name, _, params = metric.strip().partition(";")
+            if name != "wait":
+                continue
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "dur":
+                    try:
+                        return max(float(value) / 1000, 0.0)
+                    except ValueError:
+                        return 0.0
+        return 0.0
+    
+    def _overload_backoff(self, error: dict, deadline: Optional[float]) -> Optional[float]:
+        """Jittered delay before resubmitting an overloaded task, or None if the budget can't cover it
+        
+        Jitter spreads out callers that were refused together so they don't
+        come back as one burst.
+        """
+        
+        retry_after = (error.get("data") or {}).get("retry_after") or 1.0
+        delay = retry_after * random.uniform(0.5, 1.5)
+        remaining = self._remaining_budget(deadline)
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+    
+    async def call_agent_batch(self, calls: List[dict]) -> List[Any]:
+        """Make many JSON-RPC calls, sending one batch request per target endpoint
+        
+        Each call is a dict with target_agent_id, skill_name, context and
+        optional task_id and deadline (as in call_agent). Results are returned in call order; failed calls are
+        returned as Exception instances, like asyncio.gather(return_exceptions=True).
+        """
+        
+        results: List[Any] = [None] * len(calls)
+        batches: Dict[str, List[Tuple[int, dict, dict]]] = {}
+        
+        # Group calls by target endpoint
+        for index, call in enumerate(calls):
+            if self._remaining_budget(call.get("deadline")) == 0:
+                results[index] = DeadlineExceededError(f"Deadline passed before calling {call['target_agent_id']}")
+                continue
+            agent_info = await self._resolve_agent(call["target_agent_id"])
+            if agent_info is None:
+                results[index] = Exception(f"Agent {call['target_agent_id']} not found")
+                continue
+            if not self._get_circuit_breaker(call["target_agent_id"]).allow_request():
+                results[index] = CircuitOpenError(f"Circuit open for agent {call['target_agent_id']}")
+                continue
+            batches.setdefault(agent_info["endpoint"], []).append((index, call, agent_info))
+        
+        await asyncio.gather(*(
+            self._send_batch(agent_endpoint, batch, results)
+            for agent_endpoint, batch in batches.items()
+        ))
+        
+        return results
+    
+    async def _send_batch(self, 
+                          agent_endpoint: str, 
+                          batch: List[Tuple[int, dict, dict]], 
+                          results: List[Any]):
+        """Send one JSON-RPC batch to an agent and monitor every created task"""
+        
+        # Don't send calls whose budget ran out while others were being resolved
+        for index, call, _ in batch:
+            if self._remaining_budget(call.get("deadline")) == 0:
+                results[index] = DeadlineExceededError(f"Deadline passed before calling {call['target_agent_id']}")
+        batch = [entry for entry in batch if results[entry[0]] is None]
+        if not batch:
+            return
+        
+        request_data = []
+        requests_by_id: Dict[str, Tuple[int, dict, dict, str]] = {}
+        
+        # Calls in a batch share an endpoint, so they share one multiplexed stream
+        target_agents = sorted({call["target_agent_id"] for _, call, _ in batch})
+        event_stream = None
+        if any(agent_info.get("capabilities", {}).get("streaming", False) for _, _, agent_info in batch):
+            event_stream = await self._get_event_stream(target_agents[0], agent_endpoint)
+        task_events: Dict[str, asyncio.Queue] = {}
+        
+        for index, call, agent_info in batch:
+            request_id = str(uuid.uuid4())
+            params = {
+                "task_id": call.get("task_id") or str(uuid.uuid4()),
+                "context": call["context"]
+            }
+            remaining = self._remaining_budget(call.get("deadline"))
+            if remaining is not None:
+                params["timeout_ms"] = int(remaining * 1000)
+            if event_stream is not None:
+                params["stream_channel"] = event_stream.channel
+                task_events[params["task_id"]] = event_stream.register(params["task_id"])
+            request_data.append({
+                "jsonrpc": "2.0",
+                "method": call["skill_name"],
+                "params": params,
+                "id": request_id
+            })
+            requests_by_id[request_id] = (index, call, agent_info, params["task_id"])
+        
+        batch_deadlines = [call.get("deadline") for _, call, _ in batch]
+        batch_deadline = None if None in batch_deadlines else max(batch_deadlines)
+        
+        target_agent = ",".join(target_agents)
+        batch_id = str(uuid.uuid4())
+        start_time = datetime.utcnow()
+        
+        # Log outgoing batch
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=start_time.isoformat(),
+            source_agent=self.agent_id,
+            target_agent=target_agent,
+            message_type="request",
+            method="batch",
+            message_id=batch_id,
+            content={"batch": request_data}
+        ))
+        
+        try:
+            # The batch is one request, so it takes one slot in each target's bulkhead
+            async with AsyncExitStack() as slots:
+                for agent_id in target_agents:
+                    await slots.enter_async_context(self._bulkhead_slot(agent_id, batch_deadline))
+                response = await self._post_task_request(
+                    f"{agent_endpoint}/tasks",
+                    request_data,
+                    batch_deadline,
+                    [self._get_circuit_breaker(agent_id) for agent_id in target_agents]
+                )
+            
+            end_time = datetime.utcnow()
+            latency = (end_time - start_time).total_seconds() * 1000
+            
+            for agent_id in target_agents:
+                breaker = self._get_circuit_breaker(agent_id)
+                if response.status_code == 200:
+                    breaker.record_success(latency / 1000)
+                else:
+                    breaker.record_failure(f"HTTP {response.status_code}")
+            
+            if response.status_code != 200:
+                raise Exception(f"Agent batch call failed: {response.status_code} {response.text}")
+            
+            response_data = response.json()
+            if not isinstance(response_data, list):
+                raise Exception(f"Agent batch call failed: {response_data}")
+            
+            # Log response
+            traffic_monitor.log_message(A2AMessage(
+                timestamp=end_time.isoformat(),
+                source_agent=target_agent,
+                target_agent=self.agent_id,
+                message_type="response",
+                method="batch",
+                message_id=batch_id,
+                content={"batch": response_data},
+                latency_ms=latency
+            ))
+        except Exception as e:
+            traffic_monitor.log_message(A2AMessage(
+                timestamp=datetime.utcnow().isoformat(),
+                source_agent=target_agent,
+                target_agent=self.agent_id,
+                message_type="error",
+                method="batch",
+                message_id=batch_id,
+                content={"error": str(e)}
+            ))
+            for index, _, _ in batch:
+                results[index] = e
+            for task_id in task_events:
+                event_stream.unregister(task_id)
+            return
+        
+        async def complete(index: int, call: dict, agent_info: dict, item: dict, task_id: str):
+            error = item.get("error")
+            if error and error.get("code") == TASK_OVERLOADED:
+                # Shed by the agent: back off, then resubmit on its own with the usual retries
+                self.overload_rejections += 1
+                delay = self._overload_backoff(error, call.get("deadline"))
+                if delay is None:
+                    results[index] = AgentOverloadedError(
+                        f"Agent {call['target_agent_id']} overloaded: {error.get('message')}",
+                        (error.get("data") or {}).get("retry_after")
+                    )
+                    return
+                if event_stream is not None:
+                    event_stream.unregister(task_id)
+                await asyncio.sleep(delay)
+                try:
+                    results[index] = await self.call_agent(
+                        call["target_agent_id"], call["skill_name"], call["context"], task_id, call.get("deadline")
+                    )
+                except Exception as e:
+                    results[index] = e
+                return
+            if error:
+                results[index] = Exception(f"Agent call failed: {item}")
+                return
+            
+            result = item.get("result", {})
+            returned_task_id = result.get("task_id")
+            if not returned_task_id:
+                results[index] = result
+                return
+            
+            try:
+                results[index] = await self._monitor_task_completion(
+                    call["target_agent_id"],
+                    returned_task_id,
+                    agent_endpoint,
+                    agent_info.get("capabilities", {}).get("streaming", False),
+                    self._budgeted_timeout(self.task_timeout, call.get("deadline")),
+                    task_events.get(returned_task_id)
+                )
+            except Exception as e:
+                results[index] = e
+        
+        completions = []
+        for item in response_data:
+            entry = requests_by_id.pop(item.get("id"), None)
+            if entry is not None:
+                index, call, agent_info, task_id = entry
+                completions.append(complete(index, call, agent_info, item, task_id))
+        
+        # Requests the agent did not answer
+        for index, _, _, _ in requests_by_id.values():
+            results[index] = Exception("Agent batch response missing entry")
+        
+        try:
+            await asyncio.gather(*completions)
+        finally:
+            for task_id in task_events:
+                event_stream.unregister(task_id)
     
     async def _monitor_task_completion(self, 
                                      agent_id: str, 
                                      task_id: str, 
-                                     agent_endpoint: str) -> dict:
-        """Monitor task completion and return final result"""
+                                     agent_endpoint: str,
+                                     streaming: bool = True,
+                                     max_wait: float = 120,
+                                     events: Optional[asyncio.Queue] = None) -> dict:
+        """Monitor task completion and return final result
         
-        max_wait = 120  # 2 minutes
-        check_interval = 2  # 2 seconds
-        elapsed = 0
+        `events` is the task's queue on a multiplexed AgentEventStream; without
+        it a dedicated /stream/{task_id} connection is opened.
+        """
         
-        async with httpx.AsyncClient() as client:
-            while elapsed < max_wait:
-                try:
-                    # Check task status
-                    response = await client.get(f"{agent_endpoint}/tasks/{task_id}")
+        started = time.monotonic()
+        if streaming:
+            try:
+                if events is not None:
+                    follow = self._follow_task_events(agent_id, task_id, agent_endpoint, events)
+                else:
+                    follow = self._stream_task_completion(agent_id, task_id, agent_endpoint)
+                return await asyncio.wait_for(follow, timeout=max_wait)
+            except asyncio.TimeoutError:
+                return {"status": "timeout", "message": "Task monitoring timed out"}
+            except Exception as e:
+                logger.warning(f"Streaming task {task_id} failed, falling back to polling: {e}")
+        
+        # Poll only for whatever the stream left of the budget
+        remaining = max(max_wait - (time.monotonic() - started), 0.0)
+        return await self._poll_task_completion(agent_id, task_id, agent_endpoint, remaining)
+    
+    async def _stream_task_completion(self, agent_id: str, task_id: str, agent_endpoint: str) -> dict:
+        """Follow the agent's SSE stream until the task reaches a terminal event"""
+        
+        client = self._get_http_client()
+        
+        async with client.stream("GET", f"{agent_endpoint}/stream/{task_id}", timeout=None) as response:
+            if response.status_code != 200:
+                raise Exception(f"Stream request failed with status {response.status_code}")
+            
+            async for event_type, data in self._iter_sse_events(response):
+                if event_type == "keepalive":
+                    continue
+                
+                self._log_stream_event(agent_id, task_id, event_type, data)
+                
+                if event_type in TERMINAL_TASK_EVENTS:
+                    return await self._final_task_status(task_id, agent_endpoint, data)
+        
+        raise Exception("Stream closed before task completed")
+    
+    async def _follow_task_events(self, 
+                                  agent_id: str, 
+                                  task_id: str, 
+                                  agent_endpoint: str, 
+                                  events: asyncio.Queue) -> dict:
+        """Read a task's events from its multiplexed stream queue until a terminal event"""
+        
+        while True:
+            event_type, data = await events.get()
+            
+            if event_type in ("task_unknown", "stream_closed"):
+                raise Exception(f"Multiplexed stream cannot follow task: {event_type}")
+            
+            self._log_stream_event(agent_id, task_id, event_type, data)
+            
+            if event_type in TERMINAL_TASK_EVENTS:
+                return await self._final_task_status(task_id, agent_endpoint, data)
+    
+    def _log_stream_event(self, agent_id: str, task_id: str, event_type: str, data: dict):
+        """Log a progress update received over SSE"""
+        
+        traffic_monitor.log_message(A2AMessage(
+            timestamp=datetime.utcnow().isoformat(),
+            source_agent=agent_id,
+            target_agent=self.agent_id,
+            message_type="progress",
+            method=event_type,
+            message_id=f"stream-{task_id}",
+            content=data
+        ))
+    
+    async def _final_task_status(self, task_id: str, agent_endpoint: str, terminal_data: dict) -> dict:
+        """Fetch the full task status so callers get the same shape as polling"""
+        
+        status_response = await self._get_http_client().get(f"{agent_endpoint}/tasks/{task_id}", timeout=5.0)
+        if status_response.status_code == 200:
+            return status_response.json()
+        return terminal_data
+    
+    @staticmethod
+    async def _iter_sse_events(response: httpx.Response):
+        """Parse a Server-Sent Events response into (event, data) pairs"""
+        
+        event_type = "message"
+        data_lines = []
+        
+        async for line in response.aiter_lines():
+            if line.startswith("event:"):
+                event_type = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data_lines.append(line[len("data:"):].strip())
+            elif line == "":
+                if data_lines:
+                    try:
+                        data = json.loads("\n".join(data_lines))
+                    except ValueError:
+                        data = {"raw": "\n".join(data_lines)}
+                    yield event_type, data
+                event_type = "message"
+                data_lines = []
+    
+    async def _poll_task_completion(self, 
+                                  agent_id: str, 
+                                  task_id: str, 
+                                  agent_endpoint: str, 
+                                  max_wait: float) -> dict:
+        """Long-poll task status until completion, backing off if the agent returns immediately"""
+        
+        check_interval = 0.25  # Start fast, back off to 2 seconds
+        max_interval = 2.0
+        long_poll_wait = 30.0
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + max_wait
+        last_status = None
+        
+        client = self._get_http_client()
+        
+        while loop.time() < deadline:
+            try:
+                # Ask the agent to hold the request until the status changes
+                wait = min(long_poll_wait, max(deadline - loop.time(), 0))
+                request_start = loop.time()
+                response = await client.get(
+                    f"{agent_endpoint}/tasks/{task_id}",
+                    params={"wait": wait},
+                    timeout=wait + 5.0
+                )
+                
+                if response.status_code == 200:
+                    task_status = response.json()
                     
-                    if response.status_code == 200:
-                        task_status = response.json()
-                        
-                        # Log progress updates
-                        traffic_monitor.log_message(A2AMessage(
-                            timestamp=datetime.utcnow().isoformat(),
-                            source_agent=agent_id,
-                            target_agent=self.agent_id,
-                            message_type="progress",
-                            method="task_status",
-                            message_id=f"status-{task_id}",
-                            content=task_status
-                        ))
-                        
-                        if task_status["status"] in ["completed", "failed"]:
-                            return task_status
+                    # Log progress updates
+                    traffic_monitor.log_message(A2AMessage(
+                        timestamp=datetime.utcnow().isoformat(),
+                        source_agent=agent_id,
+                        target_agent=self.agent_id,
+                        message_type="progress",
+                        method="task_status",
+                        message_id=f"status-{task_id}",
+                        content=task_status
+                    ))
                     
-                    await asyncio.sleep(check_interval)
-                    elapsed += check_interval
+                    if task_status["status"] in TERMINAL_TASK_STATUSES:
+                        return task_status
                     
-                except Exception as e:
-                    logger.error(f"Error monitoring task {task_id}: {e}")
-                    break
+                    status_changed = task_status["status"] != last_status
+                    last_status = task_status["status"]
+                    
+                    # A status change or a held request needs no extra delay
+                    if status_changed or loop.time() - request_start >= wait * 0.9:
+                        continue
+                
+                # Agent answered immediately without long-poll support
+                await asyncio.sleep(check_interval)
+                check_interval = min(check_interval * 2, max_interval)
+            
+            except Exception as e:
+                logger.error(f"Error monitoring task {task_id}: {e}")
+                break
         
         # Timeout
         return {"status": "timeout", "message": "Task monitoring timed out"}
@@ -1,15 +1,23 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, List, Optional, Any, AsyncGenerator
+from pydantic import BaseModel, ValidationError
+from typing import Dict, List, Optional, Any, AsyncGenerator, Tuple, Union
 import asyncio
+import hashlib
 import json
+import math
+import time
 import uuid
+from collections import deque
 from datetime import datetime
 from abc import ABC, abstractmethod
 import httpx
 
+from shared.stream_hub import TaskStreamHub
+from shared.task_store import create_task_store
+from shared.worker_pool import SkillWorkerPool
+
 class TaskRequest(BaseModel):
     jsonrpc: str = "2.0"
     method: str
@@ -20,21 +28,43 @@ class TaskResponse(BaseModel):
     jsonrpc: str = "2.0"
     result: Optional[dict] = None
     error: Optional[dict] = None
-    id: str
+    id: Optional[str] = None
+
+TASK_STATUSES = ["created", "working", "completed", "failed", "cancelled"]
+
+# Statuses after which a task never changes again
+TERMINAL_STATUSES = ["completed", "failed", "cancelled"]
+TERMINAL_EVENTS = ["task_completed", "task_failed", "task_cancelled"]
 
-class StreamEvent(BaseModel):
-    event: str  # task_started, progress, insight, artifact_ready, task_completed
-    data: dict
+# JSON-RPC server error codes (-32000 to -32099 are implementation defined)
+INVALID_REQUEST = -32600
+INVALID_PARAMS = -32602
+TASK_ID_CONFLICT = -32002
+TASK_OVERLOADED = -32003
+
+# Seconds a skill may run before the watchdog fails it, unless its card entry sets "timeout_seconds"
+DEFAULT_SKILL_TIMEOUT = 300.0
+
+# Default seconds a queued task of each customer tier may wait before it should start
+TIER_START_TARGETS = {"enterprise": 1.0, "growth": 5.0, "standard": 15.0}
 
 class TaskStatus(BaseModel):
     task_id: str
-    status: str  # created, working, completed, failed
+    status: str  # created, working, completed, failed, cancelled
     progress: int = 0
     message: str = ""
     result: Optional[dict] = None
     artifacts: List[dict] = []
     created_at: str
     updated_at: str
+    version: int = 0  # Agent-wide change counter at the task's last update, for POST /tasks/status
+
+class TaskStatusQuery(BaseModel):
+    task_ids: List[str]
+    since_version: Optional[int] = None  # Only tasks changed after this version
+    instance_id: Optional[str] = None  # Agent instance since_version came from; ignored if it restarted
+    updated_since: Optional[str] = None  # Only tasks with a later updated_at (ISO timestamp)
+    wait: float = 0  # Long-poll up to this many seconds for a change
 
 class BaseAgent(ABC):
     def __init__(self, agent_config: dict):
@@ -53,13 +83,107 @@ class BaseAgent(ABC):
             allow_headers=["*"],
         )
         
-        # Task storage (use database in production)
-        self.tasks: Dict[str, TaskStatus] = {}
-        self.task_streams: Dict[str, asyncio.Queue] = {}
+        # Task storage with bounded retention of finished tasks, configured by
+        # the optional "task_retention" block of the agent config. The optional
+        # "task_store" block picks the backend: "memory" (default) or "sqlite",
+        # which persists tasks to "path" and takes its other keys as options.
+        # The spill only applies to memory; sqlite already keeps evicted tasks.
+        retention = agent_config.get("task_retention", {})
+        store_options = dict(agent_config.get("task_store", {}))
+        backend = store_options.pop("backend", "memory")
+        if retention.get("spill_path") and backend == "memory":
+            store_options["spill_path"] = retention["spill_path"]
+        self.tasks = create_task_store(
+            backend,
+            TaskStatus.model_validate,
+            max_finished=retention.get("max_finished_tasks", 10000),
+            ttl=retention.get("ttl_seconds", 3600.0),
+            on_evict=self._forget_task,
+            **store_options
+        )
+        self.app.add_event_handler("shutdown", self.tasks.close)
+        
+        # Broadcast hub for stream events, with a bounded per-task replay buffer.
+        # Progress updates are coalesced and rate limited per task; the optional
+        # "stream_limits" config block sets "max_progress_rate" (per second, null
+        # for unlimited).
+        stream_limits = agent_config.get("stream_limits", {})
+        self.stream_hub = TaskStreamHub(
+            terminal_events=TERMINAL_EVENTS,
+            max_progress_rate=stream_limits.get("max_progress_rate", 10.0)
+        )
+        
+        # Per-task events set on every status transition, used for long-polling
+        self.task_status_events: Dict[str, asyncio.Event] = {}
+        self.max_long_poll_wait = 60.0
+        
+        # Running execute_skill coroutines, so tasks can be cancelled
+        self.running_tasks: Dict[str, asyncio.Task] = {}
+        
+        # Task counts by status, overall and per skill, maintained on every
+        # transition so /health never scans the task store. Finished statuses
+        # count every task since startup, including evicted ones.
+        self.status_counts: Dict[str, int] = {status: 0 for status in TASK_STATUSES}
+        self.skill_status_counts: Dict[str, Dict[str, int]] = {
+            skill["name"]: {status: 0 for status in TASK_STATUSES} for skill in self.config["skills"]
+        }
+        self.task_skills: Dict[str, str] = {}  # Unfinished tasks only
+        
+        # Per-skill worker pools bound concurrent execution and queued work;
+        # skills set "max_concurrency" and "max_queue" in the agent card.
+        # Queued tasks start earliest-deadline-first, where a task's start
+        # target comes from its tier and is capped by its own deadline; the
+        # optional "scheduling" config block tunes both and the aging limit.
+        scheduling = agent_config.get("scheduling", {})
+        self.tier_start_targets: Dict[str, float] = {
+            **TIER_START_TARGETS, **scheduling.get("tier_start_targets", {})
+        }
+        self.worker_pools: Dict[str, SkillWorkerPool] = {
+            skill["name"]: SkillWorkerPool(
+                skill["name"],
+                max_concurrency=skill.get("max_concurrency", 10),
+                max_queue=skill.get("max_queue", 100),
+                max_wait=scheduling.get("max_queue_wait_seconds", 30.0)
+            )
+            for skill in self.config["skills"]
+        }
+        
+        # Per-skill execution timeouts, enforced by a watchdog over working
+        # tasks. A skill entry's "timeout_seconds" overrides the default; null
+        # disables the limit. Tasks past their limit are failed and their pool
+        # slot reclaimed even if the skill ignores cancellation.
+        self.skill_timeouts: Dict[str, Optional[float]] = {
+            skill["name"]: skill.get("timeout_seconds", DEFAULT_SKILL_TIMEOUT) for skill in self.config["skills"]
+        }
+        self.working_since: Dict[str, Tuple[float, asyncio.Task]] = {}  # task_id -> (start, execution task)
+        self.watchdog_interval = 1.0
+        self.timed_out_tasks: Dict[str, int] = {skill["name"]: 0 for skill in self.config["skills"]}
+        self.recent_timeouts: deque = deque(maxlen=20)
+        self._watchdog: Optional[asyncio.Task] = None
+        
+        # Change tracking for batch status queries: every task update takes the
+        # next version, so callers can ask for changes since the last one seen
+        self.instance_id = uuid.uuid4().hex
+        self.status_version = self.tasks.last_version
+        self.max_status_batch = 1000
+        self._version_changed = asyncio.Event()
+        
+        # Tasks a previous run never finished will not resume; fail them now so
+        # callers polling them get an answer instead of waiting out their timeout
+        for task in self.tasks.interrupted():
+            self._count_status_change(task.task_id, None, "failed")
+            task.status = "failed"
+            task.message = "Task failed: interrupted by agent restart"
+            self._mark_changed(task)
+            self.tasks.mark_finished(task.task_id)
+        
+        # Synchronous submission (POST /tasks?wait=) bounds
+        self.default_sync_wait = 10.0
+        self.max_sync_wait = 60.0
         
         # Setup routes
         self._setup_routes()
-        
+    
     def _setup_routes(self):
         """Setup standard A2A protocol routes"""
         
@@ -67,106 +191,191 @@ class BaseAgent(ABC):
         async def get_agent_card():
             """Return agent capabilities card"""
             return self.config
-            
+        
         @self.app.post("/tasks")
-        async def create_task(request: TaskRequest, background_tasks: BackgroundTasks):
-            """Create and execute a new task"""
+        async def create_task(request: Union[TaskRequest, List[Any]], 
+                              http_response: Response, 
+                              wait: Optional[str] = None):
+            """Create and execute a new task, or a JSON-RPC batch of tasks
             
-            task_id = request.params.get("task_id", str(uuid.uuid4()))
-            # Use JSON-RPC method field as the skill name, fallback to params for compatibility
-            skill_required = request.method or request.params.get("skill_required")
+            With ?wait=<seconds> (or wait=true for default_sync_wait) the response
+            carries the final TaskStatus if the task finishes within that bound.
+            Tasks refused because their skill is overloaded get a TASK_OVERLOADED
+            error, and the response a Retry-After header.
+            """
             
-            # Validate skill availability
-            available_skills = [skill["name"] for skill in self.config["skills"]]
-            if skill_required not in available_skills:
-                return TaskResponse(
-                    id=request.id,
-                    error={
-                        "code": -32601,
-                        "message": f"Skill '{skill_required}' not available",
-                        "data": {"available_skills": available_skills}
-                    }
-                )
+            wait_seconds = self._parse_sync_wait(wait)
             
-            # Create task
-            task = TaskStatus(
-                task_id=task_id,
-                status="created",
-                message="Task created successfully",
-                created_at=datetime.utcnow().isoformat(),
-                updated_at=datetime.utcnow().isoformat()
-            )
+            if isinstance(request, list):
+                if not request:
+                    return TaskResponse(
+                        id=None,
+                        error={"code": INVALID_REQUEST, "message": "Invalid Request: empty batch"}
+                    )
+                # Malformed entries get their own error instead of failing the whole batch
+                responses = [self._submit_batch_item(item) for item in request]
+                self._set_retry_after(http_response, responses)
+                if wait_seconds > 0:
+                    held_from = time.monotonic()
+                    responses = await asyncio.gather(*(
+                        self._await_inline_result(response, wait_seconds) for response in responses
+                    ))
+                    self._set_wait_timing(http_response, time.monotonic() - held_from)
+                return responses
             
-            self.tasks[task_id] = task
-            self.task_streams[task_id] = asyncio.Queue()
+            response = self._submit_task(request)
+            self._set_retry_after(http_response, [response])
+            if wait_seconds > 0:
+                held_from = time.monotonic()
+                response = await self._await_inline_result(response, wait_seconds)
+                self._set_wait_timing(http_response, time.monotonic() - held_from)
+            return response
+        
+        @self.app.post("/tasks/stream")
+        async def create_task_stream(request: TaskRequest):
+            """Create a task and stream its acceptance plus every update over one SSE response"""
             
-            # Start task execution in background
-            # Add skill_required to params for execute_task
-            execution_params = request.params.copy()
-            execution_params["skill_required"] = skill_required
-            background_tasks.add_task(self._execute_task, task_id, execution_params)
+            response = self._submit_task(request)
             
-            return TaskResponse(
-                id=request.id,
-                result={
-                    "task_id": task_id,
-                    "status": "created",
-                    "message": "Task created and queued for execution"
-                }
-            )
+            async def event_generator() -> AsyncGenerator[str, None]:
+                if response.error:
+                    yield self._format_sse("task_rejected", response.model_dump())
+                    return
+                
+                yield self._format_sse("task_accepted", response.model_dump())
+                
+                # A duplicate of a finished task has nothing more to report
+                if response.result.get("status") in TERMINAL_STATUSES:
+                    return
+                
+                async for chunk in self._task_event_stream(response.result["task_id"]):
+                    yield chunk
             
+            return self._sse_response(event_generator())
+        
+        @self.app.post("/tasks/status")
+        async def get_task_statuses(query: TaskStatusQuery):
+            """Statuses of many tasks in one request, optionally only those changed since a version
+            
+            Pass back the returned instance_id and version as the next query's
+            cursor. If the agent restarted, the old cursor is ignored and every
+            known task is returned. Task ids the agent does not know are listed
+            under "unknown".
+            """
+            
+            if len(query.task_ids) > self.max_status_batch:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"At most {self.max_status_batch} task ids per request"
+                )
+            
+            since_version = query.since_version if query.instance_id in (None, self.instance_id) else None
+            wait_deadline = asyncio.get_event_loop().time() + min(max(query.wait, 0), self.max_long_poll_wait)
+            
+            while True:
+                version = self.status_version
+                changed_event = self._version_changed
+                tasks, unknown, waiting = self._changed_tasks(query, since_version)
+                
+                remaining = wait_deadline - asyncio.get_event_loop().time()
+                if tasks or unknown or not waiting or remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(changed_event.wait(), timeout=remaining)
+                except asyncio.TimeoutError:
+                    pass
+            
+            return {
+                "instance_id": self.instance_id,
+                "version": version,
+                "tasks": tasks,
+                "unknown": unknown
+            }
+        
         @self.app.get("/tasks/{task_id}")
-        async def get_task_status(task_id: str):
-            """Get current task status"""
+        async def get_task_status(task_id: str, wait: float = 0):
+            """Get current task status, optionally long-polling up to `wait` seconds for a status change"""
             
             if task_id not in self.tasks:
                 raise HTTPException(status_code=404, detail="Task not found")
-                
-            return self.tasks[task_id]
             
-        @self.app.get("/stream/{task_id}")
-        async def stream_task_updates(task_id: str):
-            """Stream real-time task updates via Server-Sent Events"""
+            if wait > 0 and self.tasks[task_id].status not in TERMINAL_STATUSES:
+                await self._wait_for_status_change(task_id, min(wait, self.max_long_poll_wait))
+            
+            return self.tasks[task_id]
+        
+        @self.app.post("/tasks/{task_id}/cancel")
+        async def cancel_task(task_id: str):
+            """Cancel a queued or running task"""
             
             if task_id not in self.tasks:
                 raise HTTPException(status_code=404, detail="Task not found")
-                
+            
+            status = self.tasks[task_id].status
+            if status in ["completed", "failed"]:
+                raise HTTPException(status_code=409, detail=f"Task already {status}")
+            
+            if status != "cancelled":
+                await self._cancel_task(task_id, "Task cancelled by request")
+            
+            return self.tasks[task_id]
+        
+        @self.app.get("/stream")
+        async def stream_many_tasks(task_ids: Optional[str] = None, channel: Optional[str] = None):
+            """Stream events for many tasks over one SSE connection
+            
+            `task_ids` is a comma-separated list of tasks to follow. With a
+            `channel` name the stream stays open after they finish, and tasks
+            submitted with params.stream_channel set to that name join it.
+            Every event's data carries its task_id.
+            """
+            
+            if not task_ids and not channel:
+                raise HTTPException(status_code=400, detail="Provide task_ids and/or channel")
+            
+            requested = [task_id for task_id in (task_ids or "").split(",") if task_id]
+            
             async def event_generator() -> AsyncGenerator[str, None]:
+                for task_id in requested:
+                    if task_id not in self.tasks:
+                        yield self._format_sse("task_unknown", {"task_id": task_id})
+                
+                events = self.stream_hub.subscribe_many(
+                    [task_id for task_id in requested if task_id in self.tasks], channel
+                )
                 try:
-                    while True:
-                        try:
-                            # Wait for new events with timeout
-                            event = await asyncio.wait_for(
-                                self.task_streams[task_id].get(), 
-                                timeout=30.0
-                            )
-                            
-                            yield f"event: {event.event}\n"
-                            yield f"data: {json.dumps(event.data)}\n\n"
-                            
-                            # Stop streaming when task completes
-                            if event.event in ["task_completed", "task_failed"]:
-                                break
-                                
-                        except asyncio.TimeoutError:
-                            # Send keepalive
-                            yield f"event: keepalive\n"
-                            yield f"data: {json.dumps({'timestamp': datetime.utcnow().isoformat()})}\n\n"
-                            
-                except Exception as e:
-                    yield f"event: error\n"
-                    yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                    if channel:
+                        # Tell the client its channel is registered and tasks can be attached
+                        yield self._format_sse("channel_open", {"channel": channel})
                     
-            return StreamingResponse(
-                event_generator(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "Access-Control-Allow-Origin": "*",
-                }
-            )
+                    async for event in events:
+                        data = event.data
+                        if event.task_id is not None and "task_id" not in data:
+                            data = {**data, "task_id": event.task_id}
+                        yield self._format_sse(event.event, data)
+                finally:
+                    await events.aclose()
+            
+            return self._sse_response(event_generator())
+        
+        @self.app.get("/stream/{task_id}")
+        async def stream_task_updates(task_id: str, last_event_id: Optional[str] = Header(None)):
+            """Stream real-time task updates via Server-Sent Events
             
+            Reconnecting clients send Last-Event-ID to resume after the last
+            event they saw, as far back as the replay buffer reaches.
+            """
+            
+            if task_id not in self.tasks:
+                raise HTTPException(status_code=404, detail="Task not found")
+            
+            try:
+                resume_after = int(last_event_id) if last_event_id else None
+            except ValueError:
+                resume_after = None
+            
+            return self._sse_response(self._task_event_stream(task_id, resume_after))
+        
         @self.app.get("/health")
         async def health_check():
             """Agent health check endpoint"""
@@ -174,15 +383,266 @@ class BaseAgent(ABC):
                 "status": "healthy",
                 "agent_id": self.config["agent_id"],
                 "timestamp": datetime.utcnow().isoformat(),
-                "active_tasks": len([t for t in self.tasks.values() if t.status == "working"])
+                "active_tasks": self.status_counts["working"],
+                "tasks": self.status_counts,
+                "skills": {
+                    skill: {
+                        "queue_depth": counts["created"],
+                        "in_flight": counts["working"],
+                        "completed": counts["completed"],
+                        "failed": counts["failed"],
+                        "cancelled": counts["cancelled"],
+                        "timed_out": self.timed_out_tasks[skill],
+                        "timeout_seconds": self.skill_timeouts[skill],
+                        "pool": self.worker_pools[skill].snapshot()
+                    }
+                    for skill, counts in self.skill_status_counts.items()
+                },
+                "watchdog": {
+                    "interval_seconds": self.watchdog_interval,
+                    "watching": len(self.working_since),
+                    "recent_timeouts": list(self.recent_timeouts)
+                },
+                "streams": self.stream_hub.get_stats(),
+                "task_store": self.tasks.get_stats()
             }
     
+    def _submit_task(self, request: TaskRequest) -> TaskResponse:
+        """Validate a single JSON-RPC task request and hand it to its skill's worker pool"""
+        
+        task_id = request.params.get("task_id", str(uuid.uuid4()))
+        # Use JSON-RPC method field as the skill name, fallback to params for compatibility
+        skill_required = request.method or request.params.get("skill_required")
+        
+        # Validate skill availability
+        available_skills = [skill["name"] for skill in self.config["skills"]]
+        if skill_required not in available_skills:
+            return TaskResponse(
+                id=request.id,
+                error={
+                    "code": -32601,
+                    "message": f"Skill '{skill_required}' not available",
+                    "data": {"available_skills": available_skills}
+                }
+            )
+        
+        # Reject malformed scheduling params before anything is stored
+        try:
+            timeout_seconds, tier = self._scheduling_params(request.params)
+        except ValueError as e:
+            return TaskResponse(
+                id=request.id,
+                error={"code": INVALID_PARAMS, "message": f"Invalid params: {e}", "data": {"task_id": task_id}}
+            )
+        
+        # A retried submission returns the existing task instead of re-executing it
+        fingerprint = self._task_fingerprint(skill_required, request.params)
+        if task_id in self.tasks:
+            if self.tasks.fingerprint(task_id) != fingerprint:
+                return TaskResponse(
+                    id=request.id,
+                    error={
+                        "code": TASK_ID_CONFLICT,
+                        "message": f"Task '{task_id}' already exists with a different payload",
+                        "data": {"task_id": task_id}
+                    }
+                )
+            
+            if request.params.get("stream_channel"):
+                self.stream_hub.attach(request.params["stream_channel"], task_id)
+            
+            result = self.tasks[task_id].model_dump()
+            result["duplicate"] = True
+            return TaskResponse(id=request.id, result=result)
+        
+        # Shed load rather than queueing without bound
+        pool = self.worker_pools[skill_required]
+        if pool.is_full():
+            pool.rejected += 1
+            return TaskResponse(
+                id=request.id,
+                error={
+                    "code": TASK_OVERLOADED,
+                    "message": f"Skill '{skill_required}' is overloaded, retry later",
+                    "data": {"task_id": task_id, "retry_after": pool.retry_after(), "queued": pool.queued}
+                }
+            )
+        
+        # Create task
+        task = TaskStatus(
+            task_id=task_id,
+            status="created",
+            message="Task created successfully",
+            created_at=datetime.utcnow().isoformat(),
+            updated_at=datetime.utcnow().isoformat()
+        )
+        self._mark_changed(task)
+        
+        self.tasks.add(task, fingerprint)
+        self.task_skills[task_id] = skill_required
+        self._count_status_change(task_id, None, "created")
+        self.stream_hub.open(task_id)
+        if request.params.get("stream_channel"):
+            # Route this task's events to the caller's multiplexed stream
+            self.stream_hub.attach(request.params["stream_channel"], task_id)
+        self.task_status_events[task_id] = asyncio.Event()
+        
+        # Start task execution in background
+        # Add skill_required to params for execute_task
+        execution_params = request.params.copy()
+        execution_params["skill_required"] = skill_required
+        
+        # Convert the caller's remaining time budget into a local deadline
+        if timeout_seconds is not None:
+            execution_params["deadline"] = asyncio.get_event_loop().time() + timeout_seconds
+        pool.submit(lambda: self._execute_task(task_id, execution_params), self._task_start_due(tier, timeout_seconds))
+        
+        return TaskResponse(
+            id=request.id,
+            result={
+                "task_id": task_id,
+                "status": "created",
+                "message": "Task created and queued for execution"
+            }
+        )
+    
+    @staticmethod
+    def _scheduling_params(params: dict) -> Tuple[Optional[float], Optional[str]]:
+        """The caller's remaining budget in seconds and the task's tier, or ValueError if malformed
+        
+        The tier is params["priority"] if given, else the customer tier in
+        the task context; a non-string context tier is ignored.
+        """
+        
+        timeout_seconds = None
+        timeout_ms = params.get("timeout_ms")
+        if timeout_ms is not None:
+            if isinstance(timeout_ms, bool) or not isinstance(timeout_ms, (int, float)) \
+                    or not math.isfinite(timeout_ms) or timeout_ms < 0:
+                raise ValueError("timeout_ms must be a non-negative number")
+            timeout_seconds = timeout_ms / 1000
+        
+        tier = params.get("priority")
+        if tier is not None and not isinstance(tier, str):
+            raise ValueError("priority must be a tier name")
+        if tier is None:
+            context = params.get("context")
+            customer = context.get("customer") if isinstance(context, dict) else None
+            customer_tier = customer.get("tier") if isinstance(customer, dict) else None
+            tier = customer_tier if isinstance(customer_tier, str) else None
+        
+        return timeout_seconds, tier
+    
+    def _task_start_due(self, tier: Optional[str], timeout_seconds: Optional[float]) -> float:
+        """Monotonic time by which a queued task should start, from its tier and deadline
+        
+        Unknown or missing tiers are scheduled as standard.
+        """
+        
+        target = self.tier_start_targets.get(tier, self.tier_start_targets["standard"])
+        if timeout_seconds is not None:
+            target = min(target, timeout_seconds)
+        return time.monotonic() + target
+    
+    @staticmethod
+    def _set_retry_after(http_response: Response, responses: List[TaskResponse]):
+        """Advertise the longest retry-after hint among overloaded responses"""
+        
+        hints = [
+            response.error["data"]["retry_after"]
+            for response in responses
+            if response.error and response.error.get("code") == TASK_OVERLOADED
+        ]
+        if hints:
+            http_response.headers["Retry-After"] = str(math.ceil(max(hints)))
+    
+    @staticmethod
+    def _set_wait_timing(http_response: Response, held: float):
+        """Report how long the response was held for inline results, so callers can tell it from slowness"""
+        http_response.headers["Server-Timing"] = f"wait;dur={held * 1000:.1f}"
+    
+    def _parse_sync_wait(self, wait: Optional[str]) -> float:
+        """Seconds to hold a POST /tasks response for the result (0 disables)"""
+        
+        if wait is None or wait.lower() in ["", "false", "0"]:
+            return 0.0
+        if wait.lower() == "true":
+            return self.default_sync_wait
+        
+        try:
+            return min(max(float(wait), 0.0), self.max_sync_wait)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid wait '{wait}', expected seconds or true/false")
+    
+    def _submit_batch_item(self, item: Any) -> TaskResponse:
+        """Validate one entry of a JSON-RPC batch and submit it"""
+        
+        try:
+            request = TaskRequest.model_validate(item)
+        except ValidationError as e:
+            request_id = item.get("id") if isinstance(item, dict) else None
+            return TaskResponse(
+                id=request_id if isinstance(request_id, str) else None,
+                error={
+                    "code": INVALID_REQUEST,
+                    "message": "Invalid Request",
+                    "data": {"errors": [
+                        ": ".join(filter(None, [".".join(map(str, err["loc"])), err["msg"]])) for err in e.errors()
+                    ]}
+                }
+            )
+        return self._submit_task(request)
+    
+    async def _await_inline_result(self, response: TaskResponse, timeout: float) -> TaskResponse:
+        """Replace a created response with the final TaskStatus if it finishes within timeout"""
+        
+        if response.error or not response.result:
+            return response
+        
+        task_id = response.result["task_id"]
+        loop = asyncio.get_event_loop()
+        deadline = loop.time() + timeout
+        
+        while self.tasks[task_id].status not in TERMINAL_STATUSES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return response
+            await self._wait_for_status_change(task_id, remaining)
+        
+        result = self.tasks[task_id].model_dump()
+        if response.result.get("duplicate"):
+            result["duplicate"] = True
+        return TaskResponse(id=response.id, result=result)
+    
+    @staticmethod
+    def _task_fingerprint(skill_name: str, params: dict) -> str:
+        """Stable hash of what a task does, ignoring per-attempt fields like timeout_ms"""
+        
+        payload = json.dumps(
+            {"skill": skill_name, "context": params.get("context", {})},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
     async def _execute_task(self, task_id: str, params: dict):
         """Execute task with progress streaming"""
         
+        # Cancelled while still queued
+        if task_id in self.tasks and self.tasks[task_id].status == "cancelled":
+            return
+        
         try:
+            # Enforce the caller's deadline, if any
+            timeout = None
+            if params.get("deadline") is not None:
+                timeout = params["deadline"] - asyncio.get_event_loop().time()
+                if timeout <= 0:
+                    raise asyncio.TimeoutError()
+            
             # Update task status
             await self._update_task_status(task_id, "working", "Task execution started")
+            self._watch_task(task_id)
             
             # Send start event
             await self._send_stream_event(task_id, "task_started", {
@@ -192,12 +652,25 @@ class BaseAgent(ABC):
                 "message": "Task execution started"
             })
             
-            # Execute the actual work (implemented by subclasses)
-            result = await self.execute_skill(
-                skill_name=params["skill_required"],
-                context=params.get("context", {}),
-                task_id=task_id
-            )
+            # Execute the actual work (implemented by subclasses) in its own
+            # asyncio task so /tasks/{task_id}/cancel can interrupt it
+            skill_task = asyncio.ensure_future(asyncio.wait_for(
+                self.execute_skill(
+                    skill_name=params["skill_required"],
+                    context=params.get("context", {}),
+                    task_id=task_id
+                ),
+                timeout=timeout
+            ))
+            self.running_tasks[task_id] = skill_task
+            try:
+                result = await skill_task
+            finally:
+                self.running_tasks.pop(task_id, None)
+            
+            # Cancelled or timed out after the skill finished but before we resumed
+            if self.tasks[task_id].status in TERMINAL_STATUSES:
+                return
             
             # Complete task
             await self._update_task_status(task_id, "completed", "Task completed successfully", result)
@@ -210,8 +683,34 @@ class BaseAgent(ABC):
                 "message": "Task completed successfully",
                 "result": result
             })
+        
+        except asyncio.CancelledError:
+            # Cancellation via _cancel_task or the watchdog has already been recorded
+            if task_id in self.tasks and self.tasks[task_id].status in TERMINAL_STATUSES:
+                return
+            raise
+        
+        except asyncio.TimeoutError:
+            # Cancelled or failed by the watchdog while the skill was unwinding
+            if task_id in self.tasks and self.tasks[task_id].status in TERMINAL_STATUSES:
+                return
+            
+            # Deadline passed; execute_skill has been cancelled
+            await self._update_task_status(task_id, "failed", "Task failed: deadline exceeded")
             
+            await self._send_stream_event(task_id, "task_failed", {
+                "task_id": task_id,
+                "status": "failed",
+                "timestamp": datetime.utcnow().isoformat(),
+                "message": "Task failed: deadline exceeded",
+                "error": "deadline_exceeded"
+            })
+        
         except Exception as e:
+            # A skill may turn cancellation into an ordinary error; keep the recorded outcome
+            if task_id in self.tasks and self.tasks[task_id].status in TERMINAL_STATUSES:
+                return
+            
             # Handle task failure
             await self._update_task_status(task_id, "failed", f"Task failed: {str(e)}")
             
@@ -222,35 +721,224 @@ class BaseAgent(ABC):
                 "message": f"Task failed: {str(e)}",
                 "error": str(e)
             })
+        
+        finally:
+            self.working_since.pop(task_id, None)
+    
+    def _watch_task(self, task_id: str):
+        """Put a task that just started working under the watchdog"""
+        
+        self.working_since[task_id] = (time.monotonic(), asyncio.current_task())
+        if self._watchdog is None or self._watchdog.done():
+            self._watchdog = asyncio.ensure_future(self._watchdog_loop())
+    
+    async def _watchdog_loop(self):
+        """Fail tasks that run past their skill's timeout, until no task is working"""
+        
+        while self.working_since:
+            await asyncio.sleep(self.watchdog_interval)
+            
+            now = time.monotonic()
+            for task_id, (started, _) in list(self.working_since.items()):
+                limit = self.skill_timeouts.get(self.task_skills.get(task_id))
+                if limit is not None and now - started > limit and task_id in self.working_since:
+                    await self._fail_hung_task(task_id, now - started, limit)
+    
+    async def _fail_hung_task(self, task_id: str, elapsed: float, limit: float):
+        """Fail a task past its skill timeout, stop its skill and reclaim its pool slot"""
+        
+        skill_name = self.task_skills.get(task_id)
+        _, execution = self.working_since.pop(task_id)
+        message = f"Task failed: exceeded {skill_name} timeout of {limit:g}s"
+        
+        await self._update_task_status(task_id, "failed", message)
+        await self._send_stream_event(task_id, "task_failed", {
+            "task_id": task_id,
+            "status": "failed",
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": message,
+            "error": "skill_timeout"
+        })
+        
+        running = self.running_tasks.get(task_id)
+        if running is not None and not running.done():
+            running.cancel()
+        self.worker_pools[skill_name].abandon(execution)
+        
+        self.timed_out_tasks[skill_name] += 1
+        self.recent_timeouts.append({
+            "task_id": task_id,
+            "skill": skill_name,
+            "elapsed_seconds": round(elapsed, 1),
+            "timed_out_at": datetime.utcnow().isoformat()
+        })
+    
+    @staticmethod
+    def _format_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+        """Format one Server-Sent Event"""
+        
+        prefix = f"id: {event_id}\n" if event_id is not None else ""
+        return f"{prefix}event: {event}\ndata: {json.dumps(data)}\n\n"
+    
+    @staticmethod
+    def _sse_response(generator: AsyncGenerator[str, None]) -> StreamingResponse:
+        """Wrap an SSE generator in a streaming response"""
+        
+        return StreamingResponse(
+            generator,
+            media_type="text/event-stream",
+            headers={
+                "Cache-Control": "no-cache",
+                "Connection": "keep-alive",
+                "Access-Control-Allow-Origin": "*",
+            }
+        )
+    
+    async def _task_event_stream(self, task_id: str, last_event_id: Optional[int] = None) -> AsyncGenerator[str, None]:
+        """Yield a task's stream events as SSE until it reaches a terminal event"""
+        
+        if task_id not in self.stream_hub:
+            # Evicted from memory: all that is left to report is how it ended
+            task = self.tasks.get(task_id)
+            if task is not None and task.status in TERMINAL_STATUSES:
+                yield self._format_sse(f"task_{task.status}", task.model_dump())
+            return
+        
+        try:
+            async for event in self.stream_hub.subscribe(task_id, last_event_id):
+                yield self._format_sse(event.event, event.data, event.id)
+                
+                # Stop streaming when task completes
+                if event.event in TERMINAL_EVENTS:
+                    break
+        
+        except Exception as e:
+            yield self._format_sse("error", {"error": str(e)})
+    
+    async def _cancel_task(self, task_id: str, message: str):
+        """Mark a task cancelled, notify stream listeners and stop its execution"""
+        
+        await self._update_task_status(task_id, "cancelled", message)
+        
+        await self._send_stream_event(task_id, "task_cancelled", {
+            "task_id": task_id,
+            "status": "cancelled",
+            "timestamp": datetime.utcnow().isoformat(),
+            "message": message
+        })
+        
+        running = self.running_tasks.get(task_id)
+        if running is not None and not running.done():
+            running.cancel()
+    
+    async def _wait_for_status_change(self, task_id: str, timeout: float):
+        """Block until the task's status changes or the timeout expires"""
+        
+        event = self.task_status_events.get(task_id)
+        if event is None:
+            return
+        
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+    
+    def _mark_changed(self, task: TaskStatus):
+        """Stamp a task update with the next version, persist it and wake batch status long-polls"""
+        
+        self.status_version += 1
+        task.version = self.status_version
+        task.updated_at = datetime.utcnow().isoformat()
+        self.tasks.save(task)
+        self._version_changed.set()
+        self._version_changed = asyncio.Event()
+    
+    def _changed_tasks(self, query: TaskStatusQuery, since_version: Optional[int]):
+        """Tasks matching a status query's filters, the unknown ids, and whether any could still change"""
+        
+        tasks = []
+        unknown = []
+        waiting = False
+        for task_id in query.task_ids:
+            task = self.tasks.get(task_id)
+            if task is None:
+                unknown.append(task_id)
+                continue
+            waiting = waiting or task.status not in TERMINAL_STATUSES
+            if since_version is not None and task.version <= since_version:
+                continue
+            if query.updated_since is not None and task.updated_at <= query.updated_since:
+                continue
+            tasks.append(task)
+        return tasks, unknown, waiting
+    
+    def _notify_status_change(self, task_id: str):
+        """Wake long-poll waiters and arm a fresh event for the next transition"""
+        
+        event = self.task_status_events.get(task_id)
+        if event is not None:
+            event.set()
+            self.task_status_events[task_id] = asyncio.Event()
     
     async def _update_task_status(self, task_id: str, status: str, message: str, result: dict = None):
         """Update task status"""
         
         if task_id in self.tasks:
+            previous_status = self.tasks[task_id].status
+            status_changed = previous_status != status
             self.tasks[task_id].status = status
             self.tasks[task_id].message = message
-            self.tasks[task_id].updated_at = datetime.utcnow().isoformat()
+            self._mark_changed(self.tasks[task_id])
             
             if result:
                 self.tasks[task_id].result = result
-                
+            
             if status == "completed":
                 self.tasks[task_id].progress = 100
+            
+            if status_changed:
+                self._count_status_change(task_id, previous_status, status)
+                self._notify_status_change(task_id)
+            
+            if status in TERMINAL_STATUSES:
+                self.tasks.mark_finished(task_id)
+    
+    def _count_status_change(self, task_id: str, old_status: Optional[str], new_status: str):
+        """Move one task between the status counters"""
+        
+        skill_counts = self.skill_status_counts.get(self.task_skills.get(task_id))
+        for counts in (self.status_counts, skill_counts):
+            if counts is None:
+                continue
+            if old_status is not None:
+                counts[old_status] -= 1
+            counts[new_status] += 1
+        
+        if new_status in TERMINAL_STATUSES:
+            self.task_skills.pop(task_id, None)
+    
+    def _forget_task(self, task_id: str):
+        """Drop per-task state when the task store evicts a finished task"""
+        
+        self.task_status_events.pop(task_id, None)
+        self.stream_hub.discard(task_id)
     
     async def _send_stream_event(self, task_id: str, event_type: str, data: dict):
         """Send streaming event to clients"""
         
-        if task_id in self.task_streams:
-            event = StreamEvent(event=event_type, data=data)
-            await self.task_streams[task_id].put(event)
+        self.stream_hub.publish(task_id, event_type, data)
     
     async def send_progress_update(self, task_id: str, progress: int, message: str, extra_data: dict = None):
-        """Send progress update during task execution"""
+        """Send progress update during task execution
+        
+        Updates may be coalesced: subscribers can miss intermediate values,
+        never the latest one (see TaskStreamHub).
+        """
         
         if task_id in self.tasks:
             self.tasks[task_id].progress = progress
             self.tasks[task_id].message = message
-            self.tasks[task_id].updated_at = datetime.utcnow().isoformat()
+            self._mark_changed(self.tasks[task_id])
         
         event_data = {
             "task_id": task_id,
@@ -262,7 +950,7 @@ class BaseAgent(ABC):
         
         if extra_data:
             event_data.update(extra_data)
-            
+        
         await self._send_stream_event(task_id, "progress", event_data)
     
     async def send_insight(self, task_id: str, insight: dict, message: str = ""):
@@ -283,6 +971,7 @@ class BaseAgent(ABC):
         
         if task_id in self.tasks:
             self.tasks[task_id].artifacts.append(artifact)
+            self._mark_changed(self.tasks[task_id])
         
         event_data = {
             "task_id": task_id,
@@ -319,7 +1008,7 @@ class BaseAgent(ABC):
                     print(f"Agent {self.config['agent_id']} registered successfully")
                 else:
                     print(f"Registration failed: {response.text}")
-                    
+        
         except Exception as e:
             print(f"Failed to register with registry: {str(e)}")
     
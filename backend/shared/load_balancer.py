@@ -0,0 +1,91 @@
+import itertools
+import random
+from typing import Dict, List, Optional
+
+class SelectionPolicy:
+    """Chooses one agent from a list of candidates offering the same skill
+    
+    `stats` maps agent_id -> {"in_flight": int, "latency": Optional[float]}
+    with live outstanding request counts and observed latency in seconds.
+    """
+    
+    name = "base"
+    
+    def select(self, candidates: List[str], stats: Dict[str, dict]) -> Optional[str]:
+        raise NotImplementedError
+
+class FirstAvailablePolicy(SelectionPolicy):
+    """Always pick the first candidate (the original orchestrator behaviour)"""
+    
+    name = "first"
+    
+    def select(self, candidates: List[str], stats: Dict[str, dict]) -> Optional[str]:
+        return candidates[0] if candidates else None
+
+class RoundRobinPolicy(SelectionPolicy):
+    """Rotate through candidates, keeping one cursor per candidate set"""
+    
+    name = "round_robin"
+    
+    def __init__(self):
+        self._cursors: Dict[tuple, itertools.count] = {}
+    
+    def select(self, candidates: List[str], stats: Dict[str, dict]) -> Optional[str]:
+        if not candidates:
+            return None
+        
+        ordered = sorted(candidates)
+        cursor = self._cursors.setdefault(tuple(ordered), itertools.count())
+        return ordered[next(cursor) % len(ordered)]
+
+class LeastOutstandingPolicy(SelectionPolicy):
+    """Pick the candidate with the fewest in-flight requests, breaking ties randomly"""
+    
+    name = "least_outstanding"
+    
+    def select(self, candidates: List[str], stats: Dict[str, dict]) -> Optional[str]:
+        if not candidates:
+            return None
+        
+        fewest = min(stats.get(c, {}).get("in_flight", 0) for c in candidates)
+        return random.choice([c for c in candidates if stats.get(c, {}).get("in_flight", 0) == fewest])
+
+class PowerOfTwoChoicesPolicy(SelectionPolicy):
+    """Sample two candidates and keep the one with the lower expected wait
+    
+    The expected wait is (in_flight + 1) * observed latency. Agents without
+    latency samples yet use the mean of the others so new replicas get traffic.
+    """
+    
+    name = "power_of_two"
+    
+    def select(self, candidates: List[str], stats: Dict[str, dict]) -> Optional[str]:
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        
+        known = [stats[c]["latency"] for c in candidates if stats.get(c, {}).get("latency") is not None]
+        default_latency = sum(known) / len(known) if known else 1.0
+        
+        def score(agent_id: str) -> float:
+            agent_stats = stats.get(agent_id, {})
+            latency = agent_stats.get("latency")
+            if latency is None:
+                latency = default_latency
+            return (agent_stats.get("in_flight", 0) + 1) * latency
+        
+        first, second = random.sample(candidates, 2)
+        return first if score(first) <= score(second) else second
+
+SELECTION_POLICIES = {
+    policy.name: policy
+    for policy in (FirstAvailablePolicy, RoundRobinPolicy, LeastOutstandingPolicy, PowerOfTwoChoicesPolicy)
+}
+
+def get_selection_policy(name: str) -> SelectionPolicy:
+    """Build a selection policy by name"""
+    
+    if name not in SELECTION_POLICIES:
+        raise ValueError(f"Unknown selection policy '{name}', expected one of {sorted(SELECTION_POLICIES)}")
+    return SELECTION_POLICIES[name]()
@@ -0,0 +1,388 @@
+import asyncio
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncGenerator, Deque, Dict, Iterable, List, Optional, Set
+
+from pydantic import BaseModel
+
+class StreamEvent(BaseModel):
+    event: str  # task_started, progress, insight, artifact_ready, task_completed, task_failed, task_cancelled, keepalive
+    data: dict
+    id: Optional[int] = None  # Per-task sequence number, sent as the SSE id for Last-Event-ID resume
+    task_id: Optional[str] = None
+
+def with_coalesced(event: StreamEvent, skipped: int) -> StreamEvent:
+    """Copy of an event whose data counts `skipped` more superseded updates"""
+    
+    if not skipped:
+        return event
+    data = dict(event.data)
+    data["coalesced"] = data.get("coalesced", 0) + skipped
+    return StreamEvent(event=event.event, data=data, id=event.id, task_id=event.task_id)
+
+class CoalescedEvent:
+    """Queue slot holding a task's latest undelivered progress event"""
+    
+    __slots__ = ("event", "skipped")
+    
+    def __init__(self, event: StreamEvent):
+        self.event = event
+        self.skipped = 0
+
+class Subscription:
+    """One subscriber's queue of events from one or more task channels
+    
+    While a task's last progress event is still queued, a newer one
+    replaces it in place rather than queueing behind it, so a lagging
+    subscriber only ever has the latest progress value waiting.
+    """
+    
+    def __init__(self, max_queued: int, backlog: Optional[List[StreamEvent]] = None, persistent: bool = False):
+        self.backlog = backlog or []
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        self.task_ids: Set[str] = set()
+        self.persistent = persistent  # Named multiplexed subscriptions outlive their current tasks
+        self.dropped = False  # Set when the subscriber fell too far behind; it should resume by id
+        self.pending_progress: Dict[str, CoalescedEvent] = {}
+    
+    def offer(self, event: StreamEvent, coalesce: bool = False) -> bool:
+        """Queue an event without blocking the publisher; False if the subscriber is full"""
+        
+        if coalesce:
+            slot = self.pending_progress.get(event.task_id)
+            if slot is not None:
+                slot.event = event
+                slot.skipped += 1
+                return True
+            item = CoalescedEvent(event)
+        else:
+            # Anything else for the task must not be overtaken by a later progress value
+            self.pending_progress.pop(event.task_id, None)
+            item = event
+        
+        try:
+            self.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            return False
+        if coalesce:
+            self.pending_progress[event.task_id] = item
+        return True
+    
+    def close(self):
+        """Stop the subscription once its queued events are drained"""
+        
+        self.dropped = True
+        try:
+            self.queue.put_nowait(None)  # Wake a subscriber waiting on an empty queue
+        except asyncio.QueueFull:
+            pass
+    
+    async def drain(self) -> AsyncGenerator[StreamEvent, None]:
+        """Yield the backlog, then queued events until closed or dropped"""
+        
+        for event in self.backlog:
+            yield event
+        self.backlog = []
+        
+        while not (self.dropped and self.queue.empty()):
+            event = await self.queue.get()
+            if event is None:
+                break
+            if isinstance(event, CoalescedEvent):
+                if self.pending_progress.get(event.event.task_id) is event:
+                    del self.pending_progress[event.event.task_id]
+                event = with_coalesced(event.event, event.skipped)
+            yield event
+
+class TaskChannel:
+    """Per-task replay buffer and subscriber set"""
+    
+    def __init__(self, replay_size: int):
+        self.replay: Deque[StreamEvent] = deque(maxlen=replay_size)
+        self.subscribers: Set[Subscription] = set()
+        self.next_id = 1
+        
+        # Progress rate limiting: the newest held-back update and when one was last sent
+        self.last_progress_at: Optional[float] = None
+        self.held: Optional[tuple] = None  # (event_type, data)
+        self.held_skipped = 0
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+
+class TaskStreamHub:
+    """Broadcasts task stream events to any number of SSE subscribers
+    
+    Each task keeps only its last `replay_size` events, so tasks nobody
+    watches cost bounded memory and late or reconnecting subscribers can
+    resume from a Last-Event-ID. Publishing never blocks: a subscriber that
+    falls `max_queued` events behind is dropped and can reconnect with its
+    last id. Keepalives for every open subscription come from one shared
+    ticker instead of a timer per connection.
+    
+    Multiplexed subscriptions follow many tasks over one connection. Named
+    ones stay open so tasks can be attached as they are submitted.
+    
+    Events of the `coalesce_events` types (progress updates) are lossy:
+    each task publishes at most `max_progress_rate` of them per second,
+    holding back the newest in between; the replay buffer keeps only the
+    latest of consecutive ones; and a lagging subscriber gets the latest
+    instead of a backlog. A delivered event whose data has a "coalesced"
+    count stands in for that many superseded updates. All other events,
+    including artifacts and terminal events, are always delivered, and a
+    held-back update is flushed before them so order is preserved.
+    """
+    
+    def __init__(self,
+                 replay_size: int = 64,
+                 max_queued: int = 256,
+                 keepalive_interval: float = 30.0,
+                 terminal_events: Iterable[str] = (),
+                 coalesce_events: Iterable[str] = ("progress",),
+                 max_progress_rate: Optional[float] = 10.0):
+        self.replay_size = replay_size
+        self.max_queued = max_queued
+        self.keepalive_interval = keepalive_interval
+        self.terminal_events = set(terminal_events)
+        self.coalesce_events = set(coalesce_events)
+        self.max_progress_rate = max_progress_rate
+        self.coalesced_events = 0  # Progress updates superseded before they were published
+        self.channels: Dict[str, TaskChannel] = {}
+        self.subscriptions: Set[Subscription] = set()
+        self.named_subscriptions: Dict[str, Subscription] = {}
+        self.dropped_subscribers = 0
+        self._ticker: Optional[asyncio.Task] = None
+    
+    def open(self, task_id: str):
+        """Create the channel for a new task"""
+        
+        self.channels.setdefault(task_id, TaskChannel(self.replay_size))
+    
+    def discard(self, task_id: str):
+        """Forget a task's channel; live subscribers finish what they already have queued"""
+        
+        channel = self.channels.pop(task_id, None)
+        if channel is None:
+            return
+        if channel.flush_handle is not None:
+            channel.flush_handle.cancel()
+        
+        for subscription in channel.subscribers:
+            subscription.task_ids.discard(task_id)
+            if not subscription.task_ids and not subscription.persistent:
+                subscription.close()
+    
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self.channels
+    
+    def publish(self, task_id: str, event_type: str, data: dict) -> Optional[StreamEvent]:
+        """Record an event in the task's replay buffer and fan it out to subscribers
+        
+        Returns None if the task has no channel or a progress update was
+        held back by the rate limit (it is sent later unless superseded).
+        """
+        
+        channel = self.channels.get(task_id)
+        if channel is None:
+            return None
+        
+        if event_type not in self.coalesce_events:
+            # Keep order: the held-back progress update goes first
+            self._flush_held(task_id)
+            return self._emit(channel, task_id, event_type, data)
+        
+        if self.max_progress_rate:
+            interval = 1.0 / self.max_progress_rate
+            now = time.monotonic()
+            if channel.last_progress_at is not None and now - channel.last_progress_at < interval:
+                if channel.held is not None:
+                    channel.held_skipped += 1
+                    self.coalesced_events += 1
+                channel.held = (event_type, data)
+                if channel.flush_handle is None:
+                    channel.flush_handle = asyncio.get_event_loop().call_later(
+                        channel.last_progress_at + interval - now, self._flush_held, task_id
+                    )
+                return None
+            channel.last_progress_at = now
+            
+            # A held update whose flush is overdue (busy loop) is superseded by this one
+            if channel.held is not None:
+                if channel.flush_handle is not None:
+                    channel.flush_handle.cancel()
+                    channel.flush_handle = None
+                superseded = channel.held_skipped + 1
+                channel.held = None
+                channel.held_skipped = 0
+                self.coalesced_events += 1
+                data = {**data, "coalesced": data.get("coalesced", 0) + superseded}
+        
+        return self._emit(channel, task_id, event_type, data)
+    
+    def _flush_held(self, task_id: str):
+        """Publish a task's held-back progress update, if any"""
+        
+        channel = self.channels.get(task_id)
+        if channel is None or channel.held is None:
+            return
+        if channel.flush_handle is not None:
+            channel.flush_handle.cancel()
+            channel.flush_handle = None
+        
+        event_type, data = channel.held
+        if channel.held_skipped:
+            data = {**data, "coalesced": data.get("coalesced", 0) + channel.held_skipped}
+        channel.held = None
+        channel.held_skipped = 0
+        channel.last_progress_at = time.monotonic()
+        self._emit(channel, task_id, event_type, data)
+    
+    def _emit(self, channel: TaskChannel, task_id: str, event_type: str, data: dict) -> StreamEvent:
+        coalesce = event_type in self.coalesce_events
+        event = StreamEvent(event=event_type, data=data, id=channel.next_id, task_id=task_id)
+        channel.next_id += 1
+        
+        # A progress update straight after another supersedes it for replay too
+        replayed = event
+        if coalesce and channel.replay and channel.replay[-1].event == event_type:
+            previous = channel.replay.pop()
+            replayed = with_coalesced(event, previous.data.get("coalesced", 0) + 1)
+        channel.replay.append(replayed)
+        
+        for subscription in list(channel.subscribers):
+            if not subscription.offer(event, coalesce):
+                self._drop(subscription)
+        
+        return event
+    
+    def _drop(self, subscription: Subscription):
+        """Detach a subscriber that fell behind from every task it follows"""
+        
+        self._detach_all(subscription)
+        subscription.dropped = True
+        self.dropped_subscribers += 1
+    
+    def _detach_all(self, subscription: Subscription):
+        for task_id in subscription.task_ids:
+            channel = self.channels.get(task_id)
+            if channel is not None:
+                channel.subscribers.discard(subscription)
+        subscription.task_ids.clear()
+    
+    def _register(self, subscription: Subscription):
+        self.subscriptions.add(subscription)
+        if self._ticker is None or self._ticker.done():
+            self._ticker = asyncio.create_task(self._keepalive_loop())
+    
+    def _attach(self, subscription: Subscription, task_id: str) -> bool:
+        """Queue a task's buffered events for a subscription and follow it until it finishes"""
+        
+        channel = self.channels.get(task_id)
+        if channel is None or subscription.dropped:
+            return False
+        if task_id in subscription.task_ids:
+            return True
+        
+        for event in channel.replay:
+            if not subscription.offer(event, event.event in self.coalesce_events):
+                self._drop(subscription)
+                return False
+        
+        # A finished task has nothing left to deliver beyond its replay
+        if not (channel.replay and channel.replay[-1].event in self.terminal_events):
+            subscription.task_ids.add(task_id)
+            channel.subscribers.add(subscription)
+        return True
+    
+    def attach(self, name: str, task_id: str) -> bool:
+        """Add a task to a named multiplexed subscription; False if it is not open"""
+        
+        subscription = self.named_subscriptions.get(name)
+        return subscription is not None and self._attach(subscription, task_id)
+    
+    async def subscribe(self, task_id: str, last_event_id: Optional[int] = None) -> AsyncGenerator[StreamEvent, None]:
+        """Yield buffered events after `last_event_id`, then live events and keepalives
+        
+        Ends when the channel is discarded or the subscriber is dropped for
+        falling behind; callers stop on terminal events themselves.
+        """
+        
+        channel = self.channels.get(task_id)
+        if channel is None:
+            return
+        
+        # Snapshot the backlog and register in the same step so no event is missed or repeated
+        backlog = [event for event in channel.replay if last_event_id is None or event.id > last_event_id]
+        subscription = Subscription(self.max_queued, backlog)
+        subscription.task_ids.add(task_id)
+        channel.subscribers.add(subscription)
+        self._register(subscription)
+        
+        try:
+            async for event in subscription.drain():
+                yield event
+        finally:
+            self._detach_all(subscription)
+            self.subscriptions.discard(subscription)
+    
+    async def subscribe_many(self,
+                             task_ids: Iterable[str],
+                             name: Optional[str] = None) -> AsyncGenerator[StreamEvent, None]:
+        """Yield events for several tasks over one subscription
+        
+        Each task is detached after its terminal event. An anonymous
+        subscription ends once all its tasks have finished; a named one stays
+        open for tasks attached later until the subscriber disconnects. A new
+        subscription under an existing name replaces the old one.
+        """
+        
+        subscription = Subscription(self.max_queued, persistent=name is not None)
+        self._register(subscription)
+        if name is not None:
+            previous = self.named_subscriptions.get(name)
+            if previous is not None:
+                previous.close()
+            self.named_subscriptions[name] = subscription
+        
+        for task_id in task_ids:
+            self._attach(subscription, task_id)
+        if not subscription.persistent and not subscription.task_ids:
+            subscription.close()
+        
+        try:
+            async for event in subscription.drain():
+                yield event
+                
+                if event.event in self.terminal_events and event.task_id in subscription.task_ids:
+                    channel = self.channels.get(event.task_id)
+                    if channel is not None:
+                        channel.subscribers.discard(subscription)
+                    subscription.task_ids.discard(event.task_id)
+                    if not subscription.persistent and not subscription.task_ids:
+                        break
+        finally:
+            self._detach_all(subscription)
+            self.subscriptions.discard(subscription)
+            if name is not None and self.named_subscriptions.get(name) is subscription:
+                del self.named_subscriptions[name]
+    
+    async def _keepalive_loop(self):
+        """Send one shared keepalive event to every subscriber until none are left"""
+        
+        while self.subscriptions:
+            await asyncio.sleep(self.keepalive_interval)
+            
+            keepalive = StreamEvent(event="keepalive", data={"timestamp": datetime.utcnow().isoformat()})
+            for subscription in self.subscriptions:
+                # A full queue already has data on the way; skip the keepalive
+                subscription.offer(keepalive)
+    
+    def get_stats(self) -> dict:
+        return {
+            "tasks": len(self.channels),
+            "subscribers": len(self.subscriptions),
+            "multiplexed_channels": len(self.named_subscriptions),
+            "dropped_subscribers": self.dropped_subscribers,
+            "replay_size": self.replay_size,
+            "max_progress_rate": self.max_progress_rate,
+            "coalesced_events": self.coalesced_events
+        }
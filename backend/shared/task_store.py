@@ -0,0 +1,375 @@
+import asyncio
+import json
+import sqlite3
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+class TaskSpill:
+    """Compact on-disk archive of evicted tasks: zlib-compressed JSON rows in SQLite
+    
+    Writes are buffered and flushed in batches so eviction stays cheap on the
+    event loop; lookups check the buffer first.
+    """
+    
+    def __init__(self, path: str, flush_every: int = 256):
+        self.path = path
+        self.flush_every = flush_every
+        self._pending: Dict[str, bytes] = {}
+        # Created with the agent but used from its event loop thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS spilled_tasks (task_id TEXT PRIMARY KEY, record BLOB NOT NULL)")
+        self._conn.commit()
+        self.count = self._conn.execute("SELECT COUNT(*) FROM spilled_tasks").fetchone()[0]
+    
+    def put(self, task_id: str, record: dict):
+        self._pending[task_id] = zlib.compress(json.dumps(record, default=str).encode())
+        self.count += 1
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+    
+    def get(self, task_id: str) -> Optional[dict]:
+        blob = self._pending.get(task_id)
+        if blob is None:
+            row = self._conn.execute("SELECT record FROM spilled_tasks WHERE task_id = ?", (task_id,)).fetchone()
+            if row is None:
+                return None
+            blob = row[0]
+        return json.loads(zlib.decompress(blob))
+    
+    def flush(self):
+        if not self._pending:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO spilled_tasks (task_id, record) VALUES (?, ?)", self._pending.items()
+        )
+        self._conn.commit()
+        self._pending.clear()
+    
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+class TaskStore:
+    """Task statuses with bounded retention for finished tasks
+    
+    Active tasks are always kept. Finished tasks are kept in LRU order and
+    evicted once idle for `ttl` seconds (since finishing or last read) or when
+    more than `max_finished` are held. Eviction runs as tasks are added or
+    finish, at O(1) amortized cost per task. Evicted tasks are archived to a
+    TaskSpill when `spill_path` is set, so lookups still answer for them;
+    otherwise they are forgotten. `on_evict(task_id)` lets the owner drop
+    its own per-task state.
+    """
+    
+    def __init__(self,
+                 model: Callable[[dict], Any],
+                 max_finished: int = 10000,
+                 ttl: Optional[float] = 3600.0,
+                 spill_path: Optional[str] = None,
+                 on_evict: Optional[Callable[[str], None]] = None):
+        self.model = model
+        self.max_finished = max_finished
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self.spill = TaskSpill(spill_path) if spill_path else None
+        
+        self._active: Dict[str, Any] = {}
+        self._finished: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()  # task_id -> (task, last touched)
+        self._fingerprints: Dict[str, str] = {}
+        self.evicted = 0
+        self.spill_hits = 0
+    
+    def add(self, task: Any, fingerprint: Optional[str] = None):
+        """Store a new, active task"""
+        
+        self._active[task.task_id] = task
+        if fingerprint is not None:
+            self._fingerprints[task.task_id] = fingerprint
+        self.save(task)
+        self.evict_expired()
+    
+    def save(self, task: Any):
+        """Record that a stored task was modified in place; a no-op in memory"""
+    
+    def interrupted(self) -> List[Any]:
+        """Tasks a previous run of the agent left unfinished; none in memory"""
+        return []
+    
+    @property
+    def last_version(self) -> int:
+        """Highest task version persisted by a previous run"""
+        return 0
+    
+    def mark_finished(self, task_id: str):
+        """Move a task that reached a terminal status into the evictable set"""
+        
+        task = self._active.pop(task_id, None)
+        if task is None:
+            return
+        self._finished[task_id] = (task, time.monotonic())
+        self.save(task)
+        self.evict_expired()
+    
+    def __contains__(self, task_id: str) -> bool:
+        return self.get(task_id) is not None
+    
+    def __getitem__(self, task_id: str) -> Any:
+        task = self.get(task_id)
+        if task is None:
+            raise KeyError(task_id)
+        return task
+    
+    def get(self, task_id: str, default: Any = None) -> Any:
+        task = self._active.get(task_id)
+        if task is not None:
+            return task
+        
+        entry = self._finished.get(task_id)
+        if entry is not None:
+            # Reads keep a finished task warm
+            self._finished[task_id] = (entry[0], time.monotonic())
+            self._finished.move_to_end(task_id)
+            return entry[0]
+        
+        record = self._lookup_archive(task_id)
+        if record is not None:
+            self.spill_hits += 1
+            return self.model(record["task"])
+        
+        return default
+    
+    def fingerprint(self, task_id: str) -> Optional[str]:
+        """Payload fingerprint recorded for a task, including evicted ones"""
+        
+        if task_id in self._fingerprints:
+            return self._fingerprints[task_id]
+        
+        record = self._lookup_archive(task_id)
+        return record.get("fingerprint") if record is not None else None
+    
+    def _lookup_archive(self, task_id: str) -> Optional[dict]:
+        """{"task", "fingerprint"} record of a task no longer held in memory"""
+        return self.spill.get(task_id) if self.spill is not None else None
+    
+    def _archive(self, task_id: str, task: Any, fingerprint: Optional[str]):
+        if self.spill is not None:
+            self.spill.put(task_id, {"task": task.model_dump(), "fingerprint": fingerprint})
+    
+    def values(self) -> Iterator[Any]:
+        """Tasks held in memory, active first"""
+        
+        yield from self._active.values()
+        for task, _ in self._finished.values():
+            yield task
+    
+    def __len__(self) -> int:
+        return len(self._active) + len(self._finished)
+    
+    def evict_expired(self):
+        """Evict finished tasks past their TTL or beyond max_finished, oldest first"""
+        
+        cutoff = time.monotonic() - self.ttl if self.ttl is not None else None
+        while self._finished:
+            task_id, (task, touched) = next(iter(self._finished.items()))
+            if len(self._finished) <= self.max_finished and (cutoff is None or touched > cutoff):
+                break
+            self._evict(task_id)
+    
+    def _evict(self, task_id: str):
+        task, _ = self._finished.pop(task_id)
+        fingerprint = self._fingerprints.pop(task_id, None)
+        self._archive(task_id, task, fingerprint)
+        self.evicted += 1
+        if self.on_evict is not None:
+            self.on_evict(task_id)
+    
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+    
+    def get_stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "active": len(self._active),
+            "finished_in_memory": len(self._finished),
+            "max_finished": self.max_finished,
+            "ttl_seconds": self.ttl,
+            "evicted": self.evicted,
+            "spilled": self.spill.count if self.spill is not None else 0,
+            "spill_hits": self.spill_hits
+        }
+
+class SQLiteTaskStore(TaskStore):
+    """TaskStore that also persists every task to a local SQLite database (WAL mode)
+    
+    Tasks modified through add() and save() are marked dirty and written in
+    one transaction every `flush_interval` seconds, or sooner once
+    `flush_batch` tasks are dirty, so a burst of status and progress
+    updates costs one commit rather than one per event; repeated updates
+    to a task between flushes collapse into one row write. With
+    synchronous=NORMAL commits don't wait for fsync: a process crash loses
+    at most the unflushed updates, an OS crash possibly the last batches.
+    
+    Memory retention works as in TaskStore, with evicted tasks read back
+    from the database. Tasks a previous run left unfinished are returned by
+    interrupted() so the agent can fail them on startup. Finished tasks
+    older than `keep_seconds` are pruned when the store opens and every
+    `prune_every` flushes after that.
+    """
+    
+    def __init__(self,
+                 model: Callable[[dict], Any],
+                 path: str,
+                 max_finished: int = 10000,
+                 ttl: Optional[float] = 3600.0,
+                 on_evict: Optional[Callable[[str], None]] = None,
+                 flush_interval: float = 0.05,
+                 flush_batch: int = 512,
+                 keep_seconds: Optional[float] = 7 * 24 * 3600.0,
+                 prune_every: int = 1000):
+        super().__init__(model, max_finished, ttl, None, on_evict)
+        self.path = path
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._dirty: Dict[str, Tuple[Any, Optional[str]]] = {}  # task_id -> (task, fingerprint)
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.keep_seconds = keep_seconds
+        self.prune_every = prune_every
+        self.flushes = 0
+        self.rows_written = 0
+        self.pruned = 0
+        
+        # Created with the agent but used from its event loop thread
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            "task_id TEXT PRIMARY KEY, finished INTEGER NOT NULL, version INTEGER NOT NULL, "
+            "fingerprint TEXT, record BLOB NOT NULL, written_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_unfinished ON tasks (finished)")
+        self._conn.commit()
+        self._prune()
+        
+        self._last_version = self._conn.execute("SELECT COALESCE(MAX(version), 0) FROM tasks").fetchone()[0]
+        
+        # Unfinished tasks from the previous run come back as active until the owner resolves them
+        self._interrupted = []
+        for fingerprint, record in self._conn.execute("SELECT fingerprint, record FROM tasks WHERE finished = 0"):
+            task = self.model(json.loads(zlib.decompress(record)))
+            self._active[task.task_id] = task
+            if fingerprint is not None:
+                self._fingerprints[task.task_id] = fingerprint
+            self._interrupted.append(task)
+    
+    def interrupted(self) -> List[Any]:
+        return list(self._interrupted)
+    
+    @property
+    def last_version(self) -> int:
+        return self._last_version
+    
+    def save(self, task: Any):
+        self._dirty[task.task_id] = (task, self._fingerprints.get(task.task_id))
+        if len(self._dirty) >= self.flush_batch:
+            self.flush()
+        elif self._flush_handle is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                # No event loop to batch on (e.g. during startup): write through
+                self.flush()
+                return
+            self._flush_handle = loop.call_later(self.flush_interval, self.flush)
+    
+    def flush(self):
+        """Write every dirty task in one transaction"""
+        
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._dirty:
+            return
+        
+        now = time.time()
+        rows = [
+            (
+                task_id,
+                0 if task_id in self._active else 1,
+                getattr(task, "version", 0),
+                fingerprint,
+                zlib.compress(json.dumps(task.model_dump(), default=str).encode()),
+                now
+            )
+            for task_id, (task, fingerprint) in self._dirty.items()
+        ]
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO tasks (task_id, finished, version, fingerprint, record, written_at) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        self._conn.commit()
+        self._dirty.clear()
+        self.flushes += 1
+        self.rows_written += len(rows)
+        if self.flushes % self.prune_every == 0:
+            self._prune()
+    
+    def _prune(self):
+        """Delete finished tasks last written more than keep_seconds ago"""
+        
+        if self.keep_seconds is None:
+            return
+        cursor = self._conn.execute(
+            "DELETE FROM tasks WHERE finished = 1 AND written_at < ?", (time.time() - self.keep_seconds,)
+        )
+        self._conn.commit()
+        self.pruned += cursor.rowcount
+    
+    def _lookup_archive(self, task_id: str) -> Optional[dict]:
+        pending = self._dirty.get(task_id)
+        if pending is not None:
+            return {"task": pending[0].model_dump(), "fingerprint": pending[1]}
+        
+        row = self._conn.execute("SELECT fingerprint, record FROM tasks WHERE task_id = ?", (task_id,)).fetchone()
+        if row is None:
+            return None
+        return {"task": json.loads(zlib.decompress(row[1])), "fingerprint": row[0]}
+    
+    def _archive(self, task_id: str, task: Any, fingerprint: Optional[str]):
+        # Already persisted, or pending in the next flush
+        pass
+    
+    def close(self):
+        self.flush()
+        self._conn.close()
+    
+    def get_stats(self) -> dict:
+        stats = super().get_stats()
+        stats.update({
+            "backend": "sqlite",
+            "path": self.path,
+            "dirty": len(self._dirty),
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "pruned": self.pruned,
+            "interrupted_on_start": len(self._interrupted)
+        })
+        return stats
+
+TASK_STORE_BACKENDS = {
+    "memory": TaskStore,
+    "sqlite": SQLiteTaskStore
+}
+
+def create_task_store(backend: str, model: Callable[[dict], Any], **options) -> TaskStore:
+    """Build a task store by backend name"""
+    
+    if backend not in TASK_STORE_BACKENDS:
+        raise ValueError(f"Unknown task store backend '{backend}', expected one of {sorted(TASK_STORE_BACKENDS)}")
+    return TASK_STORE_BACKENDS[backend](model, **options)
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Awaitable, Callable, Deque, List, Optional, Set
+
+class QueuedJob:
+    """A job waiting for a worker, ordered by when it should start"""
+    
+    __slots__ = ("due", "seq", "enqueued_at", "job", "pending")
+    
+    def __init__(self, due: float, seq: int, enqueued_at: float, job: Callable[[], Awaitable]):
+        self.due = due
+        self.seq = seq  # Tie-break: equal due times run in arrival order
+        self.enqueued_at = enqueued_at
+        self.job = job
+        self.pending = True  # Cleared once started; the other index skips it lazily
+    
+    def __lt__(self, other: "QueuedJob") -> bool:
+        return (self.due, self.seq) < (other.due, other.seq)
+
+class SkillWorkerPool:
+    """Bounded concurrency and a bounded waiting queue for one skill's tasks
+    
+    At most `max_concurrency` jobs run at once; up to `max_queue` more wait.
+    Submissions beyond that are refused so the agent can shed load instead
+    of starting unbounded work.
+    
+    Waiting jobs start earliest-due-first, where `due` is the monotonic time
+    by which the submitter wants the job started (FIFO when omitted). A job
+    that has waited `max_wait` seconds starts next regardless, so a steady
+    stream of urgent work cannot starve the rest.
+    """
+    
+    def __init__(self,
+                 skill_name: str,
+                 max_concurrency: int = 10,
+                 max_queue: int = 100,
+                 max_wait: float = 30.0):
+        self.skill_name = skill_name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.running: Set[asyncio.Task] = set()
+        self.rejected = 0
+        self.promoted = 0  # Jobs started out of order by starvation protection
+        self.reclaimed = 0  # Slots handed back from hung jobs by abandon()
+        self.avg_duration: Optional[float] = None  # EWMA of job run time, seconds
+        self.smoothing = 0.2
+        
+        self._heap: List[QueuedJob] = []
+        self._arrivals: Deque[QueuedJob] = deque()
+        self._queued = 0
+        self._seq = itertools.count()
+    
+    @property
+    def queued(self) -> int:
+        return self._queued
+    
+    def is_full(self) -> bool:
+        return len(self.running) >= self.max_concurrency and self._queued >= self.max_queue
+    
+    def submit(self, job: Callable[[], Awaitable], due: Optional[float] = None) -> bool:
+        """Start or queue a job; False if the pool and its queue are full"""
+        
+        if len(self.running) < self.max_concurrency:
+            self._start(job)
+        elif self._queued < self.max_queue:
+            now = time.monotonic()
+            entry = QueuedJob(now if due is None else due, next(self._seq), now, job)
+            heapq.heappush(self._heap, entry)
+            self._arrivals.append(entry)
+            self._queued += 1
+        else:
+            self.rejected += 1
+            return False
+        return True
+    
+    def _next_job(self) -> Optional[Callable[[], Awaitable]]:
+        """Pop the longest-waiting job if it is overdue, else the earliest-due one"""
+        
+        while self._arrivals and not self._arrivals[0].pending:
+            self._arrivals.popleft()
+        if not self._arrivals:
+            return None
+        
+        while not self._heap[0].pending:
+            heapq.heappop(self._heap)
+        
+        oldest = self._arrivals[0]
+        if time.monotonic() - oldest.enqueued_at >= self.max_wait and oldest is not self._heap[0]:
+            entry = self._arrivals.popleft()
+            self.promoted += 1
+        else:
+            entry = heapq.heappop(self._heap)
+        
+        entry.pending = False
+        self._queued -= 1
+        
+        # Keep the heap from filling up with started entries
+        if len(self._heap) > 2 * self._queued + 16:
+            self._heap = [queued for queued in self._heap if queued.pending]
+            heapq.heapify(self._heap)
+        
+        return entry.job
+    
+    def _start(self, job: Callable[[], Awaitable]):
+        task = asyncio.ensure_future(self._run(job))
+        self.running.add(task)
+        task.add_done_callback(self.running.discard)
+    
+    async def _run(self, job: Callable[[], Awaitable]):
+        started = time.monotonic()
+        try:
+            await job()
+        finally:
+            # An abandoned job's slot was already handed on
+            if asyncio.current_task() in self.running:
+                duration = time.monotonic() - started
+                if self.avg_duration is None:
+                    self.avg_duration = duration
+                else:
+                    self.avg_duration += self.smoothing * (duration - self.avg_duration)
+                
+                # Hand the freed slot to the next waiting job
+                next_job = self._next_job()
+                if next_job is not None:
+                    self._start(next_job)
+    
+    def abandon(self, task: asyncio.Task):
+        """Stop counting a hung job against the pool and start the next waiting one
+        
+        The job keeps whatever it is stuck on; it just no longer holds a slot.
+        """
+        
+        if task not in self.running:
+            return
+        self.running.discard(task)
+        self.reclaimed += 1
+        next_job = self._next_job()
+        if next_job is not None:
+            self._start(next_job)
+    
+    def retry_after(self) -> float:
+        """Seconds until a slot is likely to free up, from queue length and job duration"""
+        
+        per_job = self.avg_duration if self.avg_duration is not None else 1.0
+        estimate = per_job * (self._queued / max(self.max_concurrency, 1))
+        return round(min(max(estimate, 0.5), 30.0), 1)
+    
+    def snapshot(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "running": len(self.running),
+            "queued": self._queued,
+            "rejected": self.rejected,
+            "starvation_promotions": self.promoted,
+            "reclaimed": self.reclaimed
+        }
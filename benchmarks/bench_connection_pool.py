@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Connection Pool Benchmark
+Compares a fresh httpx.AsyncClient per request (the old A2AClient behaviour)
+against the pooled, keepalive client now owned by A2AClient.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from shared.a2a_client import A2AClient
+from shared.base_agent import BaseAgent
+
+class EchoAgent(BaseAgent):
+    """Minimal agent whose only skill returns immediately"""
+
+    def __init__(self, port: int):
+        super().__init__({
+            "agent_card_version": "1.0",
+            "name": "Echo Agent",
+            "agent_id": "echo-001",
+            "description": "Benchmark agent",
+            "version": "1.0.0",
+            "skills": [{"name": "echo", "description": "Echo the context back"}],
+            "authentication": {"type": "none"},
+            "endpoints": {"base_url": f"http://127.0.0.1:{port}", "tasks": "/tasks", "streaming": "/stream"},
+            "capabilities": {"streaming": True, "push_notifications": False, "modalities": ["text"]}
+        })
+
+    async def execute_skill(self, skill_name: str, context: dict, task_id: str) -> dict:
+        return {"echo": context}
+
+def start_agent() -> str:
+    """Start the echo agent on a free port in a background thread"""
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    agent = EchoAgent(port)
+    server = uvicorn.Server(uvicorn.Config(agent.app, host="127.0.0.1", port=port, log_level="error"))
+    threading.Thread(target=server.run, daemon=True).start()
+
+    while not server.started:
+        time.sleep(0.05)
+
+    return f"http://127.0.0.1:{port}"
+
+async def round_trip(client: httpx.AsyncClient, base_url: str, i: int):
+    """One sub-task: create the task, then read its status"""
+
+    task_id = f"bench-{i}"
+    await client.post(f"{base_url}/tasks", json={
+        "jsonrpc": "2.0",
+        "method": "echo",
+        "params": {"task_id": task_id, "context": {"i": i}},
+        "id": task_id
+    })
+    await client.get(f"{base_url}/tasks/{task_id}")
+
+async def run_fresh(base_url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            async with httpx.AsyncClient(timeout=30.0) as client:
+                await round_trip(client, base_url, i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - start
+
+async def run_pooled(base_url: str, requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    a2a_client = A2AClient("bench-001")
+    client = a2a_client._get_http_client()
+
+    async def one(i: int):
+        async with semaphore:
+            await round_trip(client, base_url, requests + i)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        return time.perf_counter() - start
+    finally:
+        await a2a_client.aclose()
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark A2AClient connection pooling")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    base_url = start_agent()
+
+    print(f"🔹 {args.requests} sub-tasks (POST /tasks + GET /tasks/{{id}}), concurrency {args.concurrency}")
+
+    fresh = await run_fresh(base_url, args.requests, args.concurrency)
+    print(f"   Fresh client per request: {fresh:.2f}s ({args.requests / fresh:.0f} sub-tasks/s)")
+
+    pooled = await run_pooled(base_url, args.requests, args.concurrency)
+    print(f"   Pooled keepalive client:  {pooled:.2f}s ({args.requests / pooled:.0f} sub-tasks/s)")
+
+    print(f"   Speedup: {fresh / pooled:.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+SSE Fan-out Benchmark
+Opens thousands of concurrent /stream/{task_id} connections to one task on one
+agent and measures how fast each stream event reaches every subscriber, plus
+the agent's memory with all connections held open.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+def run_agent(port: int, keepalive_interval: float):
+    """Agent process entry point"""
+
+    import uvicorn
+    from shared.base_agent import BaseAgent
+
+    class TickerAgent(BaseAgent):
+        """Agent whose only skill emits a progress event at a fixed interval"""
+
+        def __init__(self):
+            super().__init__({
+                "agent_card_version": "1.0",
+                "name": "Ticker Agent",
+                "agent_id": "ticker-001",
+                "description": "Benchmark agent",
+                "version": "1.0.0",
+                "skills": [{"name": "tick", "description": "Emit progress events"}],
+                "authentication": {"type": "none"},
+                "endpoints": {"base_url": f"http://127.0.0.1:{port}", "tasks": "/tasks", "streaming": "/stream"},
+                "capabilities": {"streaming": True, "push_notifications": False, "modalities": ["text"]}
+            })
+            self.stream_hub.keepalive_interval = keepalive_interval
+
+        async def execute_skill(self, skill_name: str, context: dict, task_id: str) -> dict:
+            # Hold the first event until every subscriber is connected, then idle for keepalives
+            while len(self.stream_hub.subscriptions) < context["subscribers"]:
+                await asyncio.sleep(0.05)
+            for i in range(context["events"]):
+                await self.send_progress_update(task_id, i, f"tick {i}", {"sent_at": time.time()})
+                await asyncio.sleep(context["interval"])
+            await asyncio.sleep(context["idle"])
+            return {"events": context["events"]}
+
+    uvicorn.run(TickerAgent().app, host="127.0.0.1", port=port, log_level="error", backlog=8192)
+
+def free_port() -> int:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    return port
+
+def agent_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def request(port: int, method: str, path: str, body: dict = None) -> dict:
+    """Minimal HTTP/1.1 request; a full client per connection would dominate the measurement"""
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    payload = json.dumps(body).encode() if body is not None else b""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload
+    )
+    response = await reader.read()
+    writer.close()
+    return json.loads(response.split(b"\r\n\r\n", 1)[1])
+
+async def subscribe(port: int, task_id: str, latencies: list, counts: dict):
+    """Hold one SSE connection open, recording per-event delivery latency"""
+
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(f"GET /stream/{task_id} HTTP/1.1\r\nHost: 127.0.0.1\r\n\r\n".encode())
+    await reader.readuntil(b"\r\n\r\n")
+    counts["connected"] += 1
+
+    try:
+        event_type = None
+        while True:
+            line = (await reader.readline()).decode()
+            if not line:
+                break
+            # Chunked transfer framing lines fall through with everything but event/data
+            if line.startswith("event:"):
+                event_type = line[6:].strip()
+            elif line.startswith("data:"):
+                if event_type == "progress":
+                    latencies.append(time.time() - json.loads(line[5:])["sent_at"])
+                elif event_type == "keepalive":
+                    counts["keepalives"] += 1
+                elif event_type == "task_completed":
+                    break
+    finally:
+        writer.close()
+
+def percentile(samples: list, p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[int(p * (len(ordered) - 1))] if ordered else 0.0
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark SSE fan-out from one task to many subscribers")
+    parser.add_argument("--connections", type=int, default=10000)
+    parser.add_argument("--events", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--keepalive-interval", type=float, default=5.0)
+    parser.add_argument("--connect-batch", type=int, default=500)
+    args = parser.parse_args()
+
+    port = free_port()
+    agent = multiprocessing.get_context("spawn").Process(target=run_agent, args=(port, args.keepalive_interval), daemon=True)
+    agent.start()
+
+    while True:
+        try:
+            await request(port, "GET", "/health")
+            break
+        except OSError:
+            await asyncio.sleep(0.1)
+
+    idle_rss = agent_rss_mb(agent.pid)
+
+    task_id = "fanout"
+    idle = args.keepalive_interval * 2.5
+    await request(port, "POST", "/tasks", {
+        "jsonrpc": "2.0",
+        "method": "tick",
+        "params": {"task_id": task_id, "context": {
+            "subscribers": args.connections, "events": args.events, "interval": args.interval, "idle": idle
+        }},
+        "id": task_id
+    })
+
+    print(f"🔹 {args.connections} SSE subscribers on one task, {args.events} events every {args.interval}s")
+
+    latencies: list = []
+    counts = {"connected": 0, "keepalives": 0}
+    subscribers = []
+
+    connect_start = time.perf_counter()
+    for offset in range(0, args.connections, args.connect_batch):
+        for _ in range(min(args.connect_batch, args.connections - offset)):
+            subscribers.append(asyncio.create_task(subscribe(port, task_id, latencies, counts)))
+        while counts["connected"] < len(subscribers):
+            await asyncio.sleep(0.01)
+    connect_time = time.perf_counter() - connect_start
+
+    connected_rss = agent_rss_mb(agent.pid)
+    print(f"   Connected in {connect_time:.2f}s, agent RSS {idle_rss:.0f} MB idle -> {connected_rss:.0f} MB")
+
+    await asyncio.gather(*subscribers)
+    expected = args.connections * args.events
+
+    print(f"   Delivered {len(latencies)}/{expected} progress events, {counts['keepalives']} keepalives")
+    print(f"   Delivery latency p50 {percentile(latencies, 0.5) * 1000:.0f} ms, "
+          f"p99 {percentile(latencies, 0.99) * 1000:.0f} ms, max {max(latencies, default=0) * 1000:.0f} ms")
+
+    agent.kill()
+
+if __name__ == "__main__":
+    asyncio.run(main())
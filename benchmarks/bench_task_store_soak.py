@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Task Store Soak Test
+Runs a large number of tasks through one BaseAgent in-process and samples the
+process RSS as it goes. With bounded retention RSS should level off once the
+finished-task limit is reached; --unbounded shows the old grow-forever shape.
+--sqlite persists every task through the SQLite-WAL task store backend.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from shared.base_agent import BaseAgent, TaskRequest
+
+class EchoAgent(BaseAgent):
+    """Minimal agent whose only skill returns immediately"""
+
+    def __init__(self, retention: dict, task_store: dict):
+        super().__init__({
+            "agent_card_version": "1.0",
+            "name": "Echo Agent",
+            "agent_id": "echo-001",
+            "description": "Benchmark agent",
+            "version": "1.0.0",
+            "skills": [{"name": "echo", "description": "Echo the context back", "max_queue": 1_000_000}],
+            "authentication": {"type": "none"},
+            "endpoints": {"base_url": "http://127.0.0.1:0", "tasks": "/tasks", "streaming": "/stream"},
+            "capabilities": {"streaming": True, "push_notifications": False, "modalities": ["text"]},
+            "task_retention": retention,
+            "task_store": task_store
+        })
+
+    async def execute_skill(self, skill_name: str, context: dict, task_id: str) -> dict:
+        await self.send_progress_update(task_id, 50, "halfway")
+        return {"echo": context}
+
+def rss_mb() -> float:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+async def main():
+    parser = argparse.ArgumentParser(description="Soak-test BaseAgent task retention")
+    parser.add_argument("--tasks", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--max-finished", type=int, default=10000)
+    parser.add_argument("--spill", action="store_true", help="Archive evicted tasks to an on-disk spill file")
+    parser.add_argument("--unbounded", action="store_true", help="Keep every finished task in memory")
+    parser.add_argument("--sqlite", action="store_true", help="Persist tasks with the SQLite task store backend")
+    args = parser.parse_args()
+
+    retention = {"max_finished_tasks": args.max_finished, "ttl_seconds": 3600.0}
+    if args.unbounded:
+        retention = {"max_finished_tasks": args.tasks, "ttl_seconds": None}
+    spill_dir = tempfile.TemporaryDirectory()
+    if args.spill:
+        retention["spill_path"] = os.path.join(spill_dir.name, "spill.db")
+    task_store = {"backend": "memory"}
+    if args.sqlite:
+        task_store = {"backend": "sqlite", "path": os.path.join(spill_dir.name, "tasks.db")}
+
+    agent = EchoAgent(retention, task_store)
+    mode = "unbounded" if args.unbounded else f"max {args.max_finished} finished" + (" + spill" if args.spill else "")
+    mode += " + sqlite" if args.sqlite else ""
+    print(f"🔹 {args.tasks} tasks through one agent ({mode})")
+    print(f"   {'tasks':>10}  {'RSS MB':>8}  {'in memory':>10}  {'tasks/s':>8}")
+
+    sample_every = max(args.tasks // args.samples, args.batch)
+    start = time.perf_counter()
+    baseline = rss_mb()
+
+    for offset in range(0, args.tasks, args.batch):
+        for i in range(offset, min(offset + args.batch, args.tasks)):
+            agent._submit_task(TaskRequest(
+                method="echo",
+                params={"task_id": f"soak-{i}", "context": {"i": i}},
+                id=str(i)
+            ))
+        pool = agent.worker_pools["echo"]
+        while pool.running:
+            await asyncio.gather(*list(pool.running))
+
+        done = min(offset + args.batch, args.tasks)
+        if done % sample_every == 0 or done == args.tasks:
+            elapsed = time.perf_counter() - start
+            print(f"   {done:>10}  {rss_mb():>8.0f}  {len(agent.tasks):>10}  {done / elapsed:>8.0f}")
+
+    # Evicted tasks still answer when spilled
+    first = agent.tasks.get("soak-0")
+    print(f"   RSS grew {rss_mb() - baseline:.0f} MB; soak-0 is {first.status if first else 'gone'}")
+    print(f"   {agent.tasks.get_stats()}")
+
+    agent.tasks.close()
+    spill_dir.cleanup()
+
+if __name__ == "__main__":
+    asyncio.run(main())